@@ -0,0 +1,139 @@
+"""
+Backup Bundle
+Gabungkan file backup dari satu proses backup ke archive zip, dipecah
+sesuai batas ukuran dokumen Telegram, dengan manifest.json di tiap part
+"""
+
+import json
+import shutil
+import zipfile
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Optional
+
+from download_buffer import DownloadBuffer
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def bundle_entry_name(file_info: Dict, archive_name: Optional[str] = None) -> str:
+    """Path entry di dalam zip: <server_name>_<server_id>/<path file>"""
+    folder = f"{file_info['server_name']}_{file_info['server_id']}"
+    return f"{folder}/{archive_name or file_info['file_path'].lstrip('/')}"
+
+
+class BundlePart:
+    """Satu file zip yang siap dikirim sebagai satu dokumen"""
+
+    def __init__(self, number: int, filename: str, spool_size: int = 0):
+        self.number = number
+        self.filename = filename
+        self.files: List[Dict] = []
+        self.manifest: List[Dict] = []
+        self.raw_size = 0
+        self._buffer = DownloadBuffer(spool_size, filename)
+        self._zip = zipfile.ZipFile(self._buffer, 'w', compression=zipfile.ZIP_DEFLATED)
+        self._names = set()
+
+    def __len__(self) -> int:
+        return len(self.manifest)
+
+    @property
+    def size(self) -> int:
+        """Ukuran zip yang sudah ditulis sejauh ini"""
+        return self._buffer.tell()
+
+    def add(self, entry_name: str, file_obj: BinaryIO, size: int, files: List[Dict]):
+        # Nama entry yang sama (misal dua archive dari server yang sama) diberi suffix
+        name = entry_name
+        counter = 1
+        while name in self._names:
+            counter += 1
+            name = f"{entry_name}.{counter}"
+        self._names.add(name)
+
+        with self._zip.open(name, 'w') as entry:
+            shutil.copyfileobj(file_obj, entry)
+        self.raw_size += size
+        self.files.extend(files)
+        self.manifest.append({
+            'entry': name,
+            'size': size,
+            'files': [
+                {
+                    'server_id': file_info['server_id'],
+                    'server_name': file_info.get('server_name'),
+                    'file_path': file_info['file_path'],
+                    'size': file_info.get('size'),
+                    'modified_at': file_info.get('modified_at')
+                }
+                for file_info in files
+            ]
+        })
+
+    def close(self, scan_id: Optional[str]) -> DownloadBuffer:
+        """Tulis manifest dan return file zip (posisi di awal)"""
+        manifest = {
+            'scan_id': scan_id,
+            'part': self.number,
+            'created_at': datetime.now().isoformat(),
+            'total_files': len(self.files),
+            'entries': self.manifest
+        }
+        self._zip.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2, ensure_ascii=False))
+        self._zip.close()
+        self._buffer.seek(0)
+        return self._buffer
+
+    def discard(self):
+        """Buang isi part tanpa mengirimnya"""
+        self._zip.close()
+        self._buffer.close()
+
+
+class BackupBundle:
+    """Kumpulkan file backup ke beberapa part zip.
+
+    Part baru dimulai kalau isi mentah part sekarang ditambah file berikutnya
+    melewati ``max_size``. Isi mentah dipakai sebagai batas karena hasil
+    deflate tidak pernah jauh lebih besar dari aslinya, jadi part yang
+    dikirim tetap di bawah batas dokumen Telegram. ``add()`` dan ``BundlePart.close()``
+    blocking (compress), jadi dijalankan di thread; pemanggil yang harus
+    memastikan ``add()``/``flush()`` tidak jalan bersamaan.
+    """
+
+    def __init__(self, scan_id: Optional[str], prefix: str, max_size: int,
+                 spool_size: int = 0):
+        self.scan_id = scan_id
+        self.prefix = prefix
+        self.max_size = max_size
+        self.spool_size = spool_size
+        self.label = scan_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.parts_created = 0
+        self._current: Optional[BundlePart] = None
+
+    def _new_part(self) -> BundlePart:
+        self.parts_created += 1
+        filename = f"{self.prefix}_{self.label}_part{self.parts_created}.zip"
+        return BundlePart(self.parts_created, filename, self.spool_size)
+
+    def add(self, entry_name: str, file_obj: BinaryIO, size: int,
+            files: List[Dict]) -> Optional[BundlePart]:
+        """Tambah satu entry; return part yang sudah penuh kalau ada"""
+        finished = None
+
+        if self._current is not None and len(self._current) and \
+                self._current.raw_size + size > self.max_size:
+            finished = self._current
+            self._current = None
+
+        if self._current is None:
+            self._current = self._new_part()
+
+        self._current.add(entry_name, file_obj, size, files)
+        return finished
+
+    def flush(self) -> Optional[BundlePart]:
+        """Ambil part terakhir yang belum dikirim"""
+        finished = self._current
+        self._current = None
+        return finished if finished is not None and len(finished) else None
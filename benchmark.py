@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark Script
+Ukur perform_scan dan perform_backup terhadap mock panel + Telegram
+(mock_server.py): servers/s, requests/s, latency p50/p99, dan peak RSS
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config import Config
+from mock_server import add_fleet_arguments, fleet_config_from_args, start_mock_server
+
+MOCK_BOT_TOKEN = '123456:mock-token'
+
+
+class RequestRecorder:
+    """Catat latency setiap request lewat event hooks httpx"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+
+    def attach(self, session):
+        session.event_hooks['request'].append(self.on_request)
+        session.event_hooks['response'].append(self.on_response)
+
+    async def on_request(self, request):
+        request.extensions['benchmark_start'] = time.perf_counter()
+
+    async def on_response(self, response):
+        started = response.request.extensions.get('benchmark_start')
+        if started is not None:
+            self.latencies.append(time.perf_counter() - started)
+        self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+
+    def reset(self):
+        self.latencies.clear()
+        self.statuses.clear()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS proses ini sejak start (termasuk mock server yang jalan di thread yang sama).
+
+    ``ru_maxrss`` tidak bisa di-reset, jadi angka fase berikutnya kumulatif:
+    kalau sama dengan fase sebelumnya, fase ini tidak menaikkan peak.
+    """
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux dalam KB, macOS dalam bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def print_report(label: str, elapsed: float, servers: int, recorder: RequestRecorder):
+    requests = len(recorder.latencies)
+    errors = sum(count for status, count in recorder.statuses.items() if status >= 400)
+
+    print(f"\n📊 {label}")
+    print(f"   • Duration: {elapsed:.2f}s")
+    print(f"   • Servers/s: {servers / elapsed:.1f}" if elapsed else "   • Servers/s: -")
+    print(f"   • Requests: {requests} ({requests / elapsed:.1f} req/s, {errors} errors)" if elapsed
+          else f"   • Requests: {requests}")
+    print(f"   • Latency p50: {percentile(recorder.latencies, 50) * 1000:.1f}ms | "
+          f"p99: {percentile(recorder.latencies, 99) * 1000:.1f}ms")
+    print(f"   • Peak RSS (cumulative): {peak_rss_mb():.1f} MB")
+
+
+async def run_benchmark(args, base_url: str, fleet_state):
+    from telegram import Bot
+    from main import AdvancedPterodactylBackupBot
+
+    bot = AdvancedPterodactylBackupBot()
+    bot.log_chat_id = 1
+
+    telegram_bot = Bot(MOCK_BOT_TOKEN, base_url=f"{base_url}/bot", base_file_url=f"{base_url}/file/bot")
+    await telegram_bot.initialize()
+    context = SimpleNamespace(bot=telegram_bot, user_data={}, job_queue=None)
+
+    recorder = RequestRecorder()
+    for session in (bot.api.app_session, bot.api.client_session, bot.api.download_session):
+        recorder.attach(session)
+
+    try:
+        scan_id = None
+        for run in range(args.runs):
+            quick_mode = args.quick and run > 0
+            message = await telegram_bot.send_message(chat_id=1, text="🔍 Benchmark scan...")
+            recorder.reset()
+
+            started = time.perf_counter()
+            scan_id = await bot.perform_scan(message, context, quick_mode=quick_mode)
+            elapsed = time.perf_counter() - started
+
+            found = len(bot.store.get_found_files(scan_id)) if scan_id else 0
+            mode = 'incremental' if quick_mode else 'full'
+            print_report(f"perform_scan #{run + 1} ({mode}, {found} files found)", elapsed, args.servers, recorder)
+
+        if args.backup and scan_id:
+            found_files = bot.store.get_found_files(scan_id)
+            servers = len({file_info['server_id'] for file_info in found_files})
+            message = await telegram_bot.send_message(chat_id=1, text="🚀 Benchmark backup...")
+            recorder.reset()
+
+            started = time.perf_counter()
+            await bot.perform_backup(message, context, found_files, scan_id=scan_id)
+            elapsed = time.perf_counter() - started
+
+            print_report(f"perform_backup ({len(found_files)} files, {fleet_state.documents} documents sent)",
+                         elapsed, servers, recorder)
+    finally:
+        await bot.api.close()
+        await telegram_bot.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scan/backup terhadap mock server')
+    add_fleet_arguments(parser)
+    parser.add_argument('--runs', type=int, default=1, help='Jumlah scan berturut-turut')
+    parser.add_argument('--quick', action='store_true', help='Scan kedua dst. pakai incremental scan')
+    parser.add_argument('--backup', action='store_true', help='Jalankan perform_backup setelah scan')
+    parser.add_argument('--bot-rate-limit', type=int, default=0,
+                        help='Rate limit client API di sisi bot (0 = tanpa limit, ukur throughput murni)')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    server, state = start_mock_server(fleet_config_from_args(args))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    workdir = tempfile.mkdtemp(prefix='ptero-bench-')
+
+    # Semua data benchmark di direktori sementara, bukan database bot asli
+    Config.PTERODACTYL_DOMAIN = base_url
+    Config.PTERODACTYL_API_KEY = 'ptla_mock'
+    Config.PTERODACTYL_CLIENT_API_KEY = 'ptlc_mock'
+    Config.TELEGRAM_BOT_TOKEN = MOCK_BOT_TOKEN
+    Config.DATABASE_FILE = os.path.join(workdir, 'bot_data.db')
+    # Tanpa ini bot_data.json asli di cwd ikut diimport lalu di-rename jadi .migrated
+    Config.LEGACY_DATA_FILE = os.path.join(workdir, 'bot_data.json')
+    Config.APP_API_RATE_LIMIT = args.bot_rate_limit
+    Config.CLIENT_API_RATE_LIMIT = args.bot_rate_limit
+    Config.LOG_TO_FILE = False
+    Config.LOG_LEVEL = args.log_level
+
+    targets = sum(1 for target in state.fleet.targets.values() if target)
+    print("🧪 Pterodactyl Backup Bot Benchmark")
+    print(f"   • Fleet: {args.servers} servers, {args.nodes} nodes, depth {args.depth}, fan-out {args.fanout}")
+    print(f"   • Mock: {args.latency:.0f}ms latency, {args.error_rate:.1%} errors, {targets} target files")
+    print(f"   • Workdir: {workdir}")
+
+    try:
+        asyncio.run(run_benchmark(args, base_url, state))
+    finally:
+        server.shutdown()
+
+    print(f"\n📈 Mock requests: {dict(state.requests.most_common())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -18,25 +18,87 @@ class Config:
     TARGET_FILENAME = 'creds.json'
     AUTO_DELETE_AFTER_BACKUP = True
     BACKUP_FILE_PREFIX = 'creds_backup'
+    BACKUP_ARCHIVE_MODE = False  # Compress semua target file per server jadi satu archive
+    BACKUP_BUNDLE_MODE = False  # Gabung semua backup jadi zip per proses backup (+ manifest.json)
+    BACKUP_BUNDLE_MAX_SIZE = 45 * 1024 * 1024  # Batas per part zip (dokumen bot Telegram max 50MB)
+    
+    # Worker per stage pipeline backup (signed URL -> download -> upload -> delete)
+    BACKUP_SIGN_WORKERS = 4
+    BACKUP_DOWNLOAD_WORKERS = 4
+    BACKUP_UPLOAD_WORKERS = 2
+    BACKUP_DELETE_WORKERS = 2
+    BACKUP_QUEUE_SIZE = 16  # Maksimal item yang antri di antara stage
+    BACKUP_MAX_FILE_SIZE = 45 * 1024 * 1024  # File lebih besar dari ini dilewati
+    BACKUP_DEDUP_ENABLED = True  # Lewati file yang isinya sama dengan backup terakhir (SHA-256)
+    DOWNLOAD_SPOOL_SIZE = 1024 * 1024  # Per download: di memory sampai batas ini, sisanya ke disk
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
     
     # ===== SCAN CONFIGURATION =====
     SCAN_SUBDIRECTORIES = True
     MAX_SCAN_DEPTH = 3
     SCAN_TIMEOUT = 30
+    SCAN_STOP_AT_FIRST_MATCH = True  # Tidak turun lebih dalam setelah target ketemu
+    MAX_DIR_LISTINGS_PER_SERVER = 8  # Listing direktori paralel per server
+    MAX_SERVERS_PER_NODE = 4  # Server yang di-scan sekaligus per node Wings
+    MAX_REQUESTS_PER_NODE = 16  # Request in-flight sekaligus per node Wings
+    SCAN_SKIP_SUSPENDED = True  # Lewati server suspended / sedang install tanpa request
+    SCAN_RESOURCE_PROBE = False  # Cek /resources dulu, server offline di-scan paling akhir
+    RESOURCE_PROBE_BATCH = 50  # Jumlah server yang di-probe paralel
+    
+    # ===== LISTING CACHE CONFIGURATION =====
+    LISTING_CACHE_ENABLED = True
+    LISTING_CACHE_MAX_ENTRIES = 50000
+    LISTING_CACHE_TTL = 21600  # Detik (6 jam)
+    SERVER_LIST_PAGE_SIZE = 500  # per_page untuk /api/application/servers
+    
+    # ===== TELEGRAM PROGRESS CONFIGURATION =====
+    PROGRESS_UPDATE_INTERVAL = 3  # Detik minimal antar edit pesan progress
+    
+    # ===== SCHEDULER CONFIGURATION =====
+    SCHEDULED_SCAN_INTERVAL = 0  # Menit antar incremental scan otomatis (0 = nonaktif)
+    SCHEDULE_JITTER = 300  # Detik acak tambahan per run
+    OFF_PEAK_WINDOW = ''  # Full scan harian di jendela ini, misal '02:00-05:00' (waktu lokal)
+    SCHEDULED_BACKUP = False  # Langsung backup hasil scan terjadwal (tanpa konfirmasi)
+    
+    # ===== METRICS CONFIGURATION =====
+    METRICS_ENABLED = False  # Endpoint Prometheus /metrics (latency request, durasi scan, bytes backup)
+    METRICS_HOST = '127.0.0.1'  # Ganti ke 0.0.0.0 kalau Prometheus di host lain
+    METRICS_PORT = 9464
+    TRACING_ENABLED = False  # Catat span per fase tiap scan/backup untuk /profile <scan_id>
+    TRACE_MAX_SPANS = 100000  # Batas span per scan (span berikutnya dibuang)
     
     # ===== LOGGING CONFIGURATION =====
     LOG_LEVEL = 'INFO'
     LOG_TO_FILE = True
     LOG_FILENAME = 'bot_backup.log'
+    LOG_FORMAT = 'json'  # Format file log: 'json' (satu object per baris) atau 'text'
+    LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotasi per ukuran (0 = tidak dirotasi)
+    LOG_ROTATE_WHEN = ''  # Rotasi per waktu, misal 'midnight' (menggantikan rotasi per ukuran)
+    LOG_BACKUP_COUNT = 5  # Jumlah file log lama yang disimpan
+    
+    # ===== STORAGE CONFIGURATION =====
+    DATABASE_FILE = 'bot_data.db'  # SQLite (WAL) untuk scan, backup, dan statistik
+    LEGACY_DATA_FILE = 'bot_data.json'  # Dimigrasi otomatis saat start pertama
     
     # ===== SECURITY CONFIGURATION =====
     ALLOWED_USERS = []  # Empty = allow all users
     ADMIN_USER_ID = None
     
     # ===== ADVANCED CONFIGURATION =====
-    MAX_CONCURRENT_SCANS = 5
+    MAX_CONCURRENT_SCANS = 0  # Batas total server sekaligus (0 = MAX_SERVERS_PER_NODE x jumlah node)
     RETRY_ATTEMPTS = 3
-    RETRY_DELAY = 5
+    RETRY_DELAY = 2  # Jeda dasar backoff (detik), naik 2x tiap percobaan + jitter
+    RETRY_MAX_DELAY = 60  # Batas jeda, termasuk Retry-After dari 429
+    CIRCUIT_BREAKER_THRESHOLD = 5  # Gagal berturut-turut sebelum node di-skip
+    CIRCUIT_BREAKER_RESET = 60  # Detik sebelum node yang di-skip dicoba lagi
+    
+    # ===== HTTP CONFIGURATION =====
+    HTTP2_ENABLED = True  # Butuh package h2 (httpx[http2])
+    HTTP_POOL_SIZE = 20
+    HTTP_KEEPALIVE_EXPIRY = 30
+    APP_API_RATE_LIMIT = 240  # Request/menit application key (0 = tanpa limit), disesuaikan dari header panel
+    CLIENT_API_RATE_LIMIT = 720  # Request/menit client key (0 = tanpa limit)
+    RATE_LIMIT_BURST = 10
 
 def validate_config():
     """Validate configuration"""
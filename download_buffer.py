@@ -0,0 +1,73 @@
+"""
+Download Buffer
+Tampung hasil download secara streaming di SpooledTemporaryFile: kecil di
+memory, otomatis pindah ke file temp di disk kalau melewati batas
+"""
+
+import hashlib
+import tempfile
+from typing import Optional
+
+import httpx
+
+
+class DownloadTooLarge(Exception):
+    """Ukuran file melewati batas maksimal download"""
+
+
+class DownloadBuffer(tempfile.SpooledTemporaryFile):
+    """SpooledTemporaryFile dengan nama file yang bisa diset.
+
+    python-telegram-bot membaca ``name`` dari file object yang dikirim ke
+    ``send_document``; SpooledTemporaryFile biasa mengembalikan None selama
+    isinya masih di memory, jadi nama di sini diisi manual.
+    """
+
+    def __init__(self, max_size: int = 0, filename: Optional[str] = None):
+        super().__init__(max_size=max_size, mode='w+b')
+        self.filename = filename
+        self.sha256 = None
+
+    @property
+    def name(self):
+        return self.filename
+
+    @property
+    def size(self) -> int:
+        position = self.tell()
+        self.seek(0, 2)
+        size = self.tell()
+        self.seek(position)
+        return size
+
+
+async def read_response(response: httpx.Response, max_bytes: int,
+                        spool_size: int, chunk_size: int = 65536) -> DownloadBuffer:
+    """Baca body response (stream) ke DownloadBuffer, sekalian hitung SHA-256.
+
+    Content-Length dicek dulu supaya file yang jelas terlalu besar tidak
+    di-download sama sekali; selama streaming jumlah byte tetap dihitung
+    karena header bisa tidak ada atau salah.
+    """
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise DownloadTooLarge(f"{content_length} bytes > limit {max_bytes} bytes")
+
+    buffer = DownloadBuffer(spool_size)
+    digest = hashlib.sha256()
+    received = 0
+
+    try:
+        async for chunk in response.aiter_bytes(chunk_size):
+            received += len(chunk)
+            if received > max_bytes:
+                raise DownloadTooLarge(f"more than {max_bytes} bytes")
+            digest.update(chunk)
+            buffer.write(chunk)
+    except BaseException:
+        buffer.close()
+        raise
+
+    buffer.sha256 = digest.hexdigest()
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,55 @@
+"""
+Job Scheduler
+Helper waktu untuk scan/backup terjadwal: interval dengan jitter dan
+jendela off-peak harian (format "HH:MM-HH:MM", waktu lokal)
+"""
+
+import random
+from datetime import datetime, time, timedelta
+from typing import Optional, Tuple
+
+TimeWindow = Tuple[time, time]
+
+
+def parse_time_window(text: Optional[str]) -> Optional[TimeWindow]:
+    """Parse "02:00-05:00" jadi (start, end); string kosong = tidak aktif"""
+    if not text:
+        return None
+
+    try:
+        start, end = (part.strip() for part in text.split('-', 1))
+        return (datetime.strptime(start, '%H:%M').time(),
+                datetime.strptime(end, '%H:%M').time())
+    except ValueError:
+        raise ValueError(f"Invalid time window '{text}', expected HH:MM-HH:MM")
+
+
+def window_length(window: TimeWindow) -> timedelta:
+    """Panjang jendela; jendela yang melewati tengah malam (22:00-04:00) didukung"""
+    start = datetime.combine(datetime.min, window[0])
+    end = datetime.combine(datetime.min, window[1])
+    if end <= start:
+        end += timedelta(days=1)
+    return end - start
+
+
+def next_window_run(window: TimeWindow, now: datetime) -> datetime:
+    """Waktu acak di jendela off-peak berikutnya yang belum lewat"""
+    length = window_length(window)
+
+    for day_offset in (-1, 0, 1):
+        start = datetime.combine(now.date() + timedelta(days=day_offset), window[0], tzinfo=now.tzinfo)
+        end = start + length
+        if end <= now:
+            continue
+
+        # Sudah di dalam jendela: pilih sisa waktunya saja
+        earliest = max(start, now)
+        return earliest + timedelta(seconds=random.uniform(0, (end - earliest).total_seconds()))
+
+    raise AssertionError("unreachable: a daily window always recurs within two days")
+
+
+def jittered_delay(seconds: float, jitter: float) -> float:
+    """Interval + jitter acak 0..jitter detik, supaya run tidak selalu di detik yang sama"""
+    return seconds + random.uniform(0, max(0.0, jitter))
@@ -0,0 +1,137 @@
+"""
+Listing Cache
+Cache hasil files/list per (server_id, path) dengan LRU eviction, TTL per
+entry, dan invalidasi berdasarkan modified_at direktori
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Atribut file_object yang dipakai scanner; sisanya tidak perlu disimpan
+CACHED_ATTRIBUTES = ('name', 'is_file', 'size', 'modified_at')
+
+
+class ListingCache:
+    """LRU cache untuk listing direktori Pterodactyl.
+
+    Entry disimpan bersama ``modified_at`` direktori itu sendiri (diambil
+    dari listing parent-nya). Saat scan berikutnya, kalau parent masih
+    melaporkan ``modified_at`` yang sama dan entry belum expired, listing
+    dipakai dari cache tanpa request, dan child direktorinya dicek dengan
+    cara yang sama - subtree yang tidak berubah jadi tidak di-list ulang.
+    Perubahan di cucu tidak mengubah mtime direktori di atasnya, jadi TTL
+    yang membatasi seberapa lama hasil basi bisa dipakai.
+    
+    Cache dipersist ke tabel ``listing_cache`` di ``store`` (BotStorage).
+    ``save()`` hanya menulis entry yang berubah sejak save terakhir, jadi
+    biayanya sebanding dengan jumlah direktori yang di-list, bukan ukuran
+    seluruh cache.
+    """
+
+    def __init__(self, max_entries: int = 50000, ttl: float = 21600, store=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self.entries: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._removed: Set[Tuple[str, str]] = set()
+        self._cleared = False
+
+    def _remove(self, key: Tuple[str, str]):
+        del self.entries[key]
+        self._dirty.discard(key)
+        self._removed.add(key)
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, server_id: str, path: str, dir_mtime: Optional[str]) -> Optional[List[Dict]]:
+        """Ambil listing dari cache, atau None kalau miss/expired/berubah"""
+        if dir_mtime is None:
+            return None
+
+        key = (server_id, path)
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry['expires_at'] <= time.time() or entry['dir_mtime'] != dir_mtime:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return [{'attributes': dict(attributes)} for attributes in entry['files']]
+
+    def put(self, server_id: str, path: str, files: List[Dict],
+            dir_mtime: Optional[str], ttl: Optional[float] = None):
+        """Simpan listing; direktori tanpa mtime (root) tidak di-cache"""
+        if dir_mtime is None:
+            return
+
+        key = (server_id, path)
+        self.entries[key] = {
+            'dir_mtime': dir_mtime,
+            'expires_at': time.time() + (ttl if ttl is not None else self.ttl),
+            'files': [
+                {name: item['attributes'].get(name) for name in CACHED_ATTRIBUTES}
+                for item in files
+            ]
+        }
+        self.entries.move_to_end(key)
+        self._dirty.add(key)
+        self._removed.discard(key)
+        self._evict()
+
+    def invalidate(self, server_id: str, path: str = "/"):
+        """Hapus entry untuk path dan semua subdirektorinya"""
+        prefix = path.rstrip('/') + '/'
+        stale = [
+            key for key in self.entries
+            if key[0] == server_id and (key[1] == path or key[1].startswith(prefix))
+        ]
+        for key in stale:
+            self._remove(key)
+
+    def clear(self) -> int:
+        """Kosongkan cache, return jumlah entry yang dihapus"""
+        count = len(self.entries)
+        self.entries.clear()
+        self._dirty.clear()
+        self._removed.clear()
+        self._cleared = True
+        return count
+
+    def load(self):
+        """Load cache dari database, entry yang sudah expired dibuang"""
+        if self.store is None:
+            return
+
+        for server_id, path, entry in self.store.load_listing_cache(time.time()):
+            self.entries[(server_id, path)] = entry
+        self._evict()
+
+    def save(self):
+        """Tulis perubahan sejak save terakhir ke database"""
+        if self.store is None:
+            return
+
+        if self._cleared:
+            self.store.clear_listing_cache()
+            self._cleared = False
+
+        entries = [(server_id, path, self.entries[(server_id, path)])
+                   for server_id, path in self._dirty if (server_id, path) in self.entries]
+        self.store.save_listing_cache(entries, list(self._removed), time.time())
+        self._dirty.clear()
+        self._removed.clear()
@@ -0,0 +1,115 @@
+"""
+Log Pipeline
+Logging lewat queue: event loop hanya memasukkan record ke antrian,
+formatting dan tulis ke console/file (JSON, dengan rotasi) dikerjakan
+thread background
+"""
+
+import atexit
+import json
+import logging
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[QueueListener] = None
+
+# Logger library HTTP menulis setiap request di INFO (termasuk signed URL download Wings)
+NOISY_LOGGERS = ('httpx', 'httpcore')
+
+# Atribut bawaan LogRecord; atribut lain berasal dari ``extra=`` dan ikut ditulis ke JSON
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu object JSON per baris: waktu, level, logger, pesan, dan field dari ``extra``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRIBUTES and not key.startswith('_'):
+                payload[key] = value
+
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """QueueHandler yang tidak memformat pesan di thread pemanggil.
+
+    ``QueueHandler.prepare`` bawaan menggabungkan msg % args sebelum
+    record masuk antrian, jadi formatting tetap terjadi di event loop.
+    Listener ada di proses yang sama, jadi record bisa dikirim apa adanya
+    dan diformat oleh thread listener. Args log jangan diubah setelah
+    dicatat.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def build_file_handler(filename: str, max_bytes: int = 0, backup_count: int = 5,
+                       rotate_when: str = '') -> logging.Handler:
+    """File handler dengan rotasi per waktu (``rotate_when``, misal 'midnight') atau per ukuran"""
+    if rotate_when:
+        return TimedRotatingFileHandler(filename, when=rotate_when, backupCount=backup_count, encoding='utf-8')
+    return RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+
+
+def setup_log_pipeline(level: int, log_to_file: bool, filename: str, json_file: bool = True,
+                       max_bytes: int = 0, backup_count: int = 5, rotate_when: str = '') -> QueueListener:
+    """Pasang QueueHandler di root logger dan jalankan listener-nya.
+
+    Console tetap teks biasa; file log berformat JSON kalau ``json_file``.
+    Listener dihentikan otomatis saat proses keluar supaya antrian sempat
+    di-flush (atau lewat ``stop_log_pipeline()``).
+    """
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = [console_handler]
+
+    if log_to_file:
+        file_handler = build_file_handler(filename, max_bytes, backup_count, rotate_when)
+        file_handler.setFormatter(JsonFormatter() if json_file else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+
+    # Listener lama (setup_logging dipanggil ulang) dihentikan dulu supaya antriannya ter-flush
+    stop_log_pipeline()
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(BackgroundQueueHandler(log_queue))
+    root.setLevel(level)
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(max(level, logging.WARNING))
+
+    global _listener
+    _listener = listener
+    listener.start()
+    return listener
+
+
+def stop_log_pipeline():
+    """Tulis sisa record di antrian lalu hentikan thread listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_log_pipeline)
@@ -1,15 +1,16 @@
-import os
 import json
-import requests
+import hashlib
+import httpx
 import asyncio
 import logging
+import time
+from collections import Counter, defaultdict
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, AsyncIterator, Tuple
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
-import concurrent.futures
 from pathlib import Path
-import io
+import posixpath
 
 # Import konfigurasi
 try:
@@ -19,6 +20,25 @@ except ImportError:
     print("📝 Silakan buat file config.py berdasarkan template yang disediakan")
     exit(1)
 
+from pterodactyl_client import PterodactylClient
+from listing_cache import ListingCache
+from storage import BotStorage, RESUMABLE_STATUS
+from backup_bundle import BackupBundle, bundle_entry_name
+from download_buffer import DownloadBuffer, DownloadTooLarge, read_response
+from scan_scheduler import NodeScheduler
+from job_scheduler import jittered_delay, next_window_run, parse_time_window, window_length
+from retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy, send_with_retry
+from log_pipeline import setup_log_pipeline
+from metrics import BotMetrics, MetricsServer
+from tracing import Trace, current_trace, span
+from progress_reporter import ProgressReporter, format_scan_progress, format_backup_progress
+
+# Status application API yang berarti file server belum/tidak bisa dibaca
+SKIPPED_SERVER_STATUS = {'installing', 'install_failed', 'reinstall_failed', 'suspended', 'restoring_backup'}
+
+# current_state /resources yang berarti daemon sedang menjalankan server itu
+ACTIVE_SERVER_STATES = {'running', 'starting', 'stopping'}
+
 class AdvancedPterodactylBackupBot:
     def __init__(self):
         # Validasi konfigurasi
@@ -45,24 +65,6 @@ class AdvancedPterodactylBackupBot:
         # Setup logging
         self.setup_logging()
         
-        # Storage
-        self.log_chat_id = None
-        self.scan_results = {}
-        self.load_persistent_data()
-        
-        # Headers API
-        self.headers = {
-            'Authorization': f'Bearer {self.apikey}',
-            'Content-Type': 'application/json',
-            'Accept': 'Application/vnd.pterodactyl.v1+json'
-        }
-        
-        self.client_headers = {
-            'Authorization': f'Bearer {self.capikey}',
-            'Content-Type': 'application/json',
-            'Accept': 'Application/vnd.pterodactyl.v1+json'
-        }
-        
         # Stats
         self.stats = {
             'total_scans': 0,
@@ -71,55 +73,99 @@ class AdvancedPterodactylBackupBot:
             'last_scan': None,
             'last_backup': None
         }
-    def setup_logging(self):
-        """Setup logging system"""
-        log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         
-        # Clear existing handlers to avoid duplicates
-        logging.getLogger().handlers.clear()
+        # Storage
+        self.log_chat_id = None
+        self.store = BotStorage(Config.DATABASE_FILE)
+        self.load_persistent_data()
         
-        # Setup level
-        level = getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO)
+        # Cache listing direktori antar scan
+        self.listing_cache = None
+        if Config.LISTING_CACHE_ENABLED:
+            self.listing_cache = ListingCache(
+                max_entries=Config.LISTING_CACHE_MAX_ENTRIES,
+                ttl=Config.LISTING_CACHE_TTL,
+                store=self.store
+            )
+            try:
+                self.listing_cache.load()
+            except Exception as e:
+                self.logger.error(f"Error loading listing cache: {e}")
+        
+        # Metrics hot path scan/backup (endpoint /metrics kalau METRICS_ENABLED)
+        self.metrics = BotMetrics()
+        self.metrics_server = None
+        
+        # Pterodactyl API client (pooled sessions untuk application & client key)
+        self.api = PterodactylClient(
+            self.domain,
+            self.apikey,
+            self.capikey,
+            pool_size=Config.HTTP_POOL_SIZE,
+            keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY,
+            http2=Config.HTTP2_ENABLED,
+            app_rate_limit=Config.APP_API_RATE_LIMIT,
+            client_rate_limit=Config.CLIENT_API_RATE_LIMIT,
+            rate_limit_burst=Config.RATE_LIMIT_BURST,
+            metrics=self.metrics
+        )
         
-        # Setup handlers
-        handlers = [logging.StreamHandler()]
+        # Retry policy bersama + circuit breaker per node Wings
+        self.retry_policy = RetryPolicy(Config.RETRY_ATTEMPTS, Config.RETRY_DELAY, Config.RETRY_MAX_DELAY)
+        self.node_breaker = CircuitBreaker(Config.CIRCUIT_BREAKER_THRESHOLD, Config.CIRCUIT_BREAKER_RESET)
+        self.server_nodes: Dict[str, int] = {}
+        self.node_semaphores = defaultdict(lambda: asyncio.Semaphore(max(1, Config.MAX_REQUESTS_PER_NODE)))
         
-        if Config.LOG_TO_FILE:
-            handlers.append(logging.FileHandler(Config.LOG_FILENAME, encoding='utf-8'))
+        # Scan/backup terjadwal: satu run sekaligus, run yang sedang jalan bisa di-cancel
+        self.job_lock = asyncio.Lock()
+        self.running_job: Optional[Dict] = None
+        
+        # Scan yang sedang berjalan (untuk tombol cancel) dan scan dari proses sebelumnya yang terputus
+        self.active_scans: Dict[str, asyncio.Task] = {}
+        self.interrupted_scans = self.store.mark_interrupted_scans()
+
+    def setup_logging(self):
+        """Setup logging system.
         
-        logging.basicConfig(
-            format=log_format,
-            level=level,
-            handlers=handlers,
-            force=True
+        Record hanya dimasukkan ke queue di event loop; formatting dan tulis
+        ke console/file (JSON dengan rotasi) dikerjakan thread listener.
+        """
+        # Setup level
+        level = getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO)
+        
+        setup_log_pipeline(
+            level,
+            Config.LOG_TO_FILE,
+            Config.LOG_FILENAME,
+            json_file=Config.LOG_FORMAT == 'json',
+            max_bytes=Config.LOG_MAX_BYTES,
+            backup_count=Config.LOG_BACKUP_COUNT,
+            rotate_when=Config.LOG_ROTATE_WHEN
         )
         
         self.logger = logging.getLogger(__name__)
         self.logger.info("🤖 Advanced Pterodactyl Backup Bot initialized")
 
     def load_persistent_data(self):
-        """Load data persisten dari file"""
+        """Load data persisten dari database (migrasi bot_data.json lama jika ada)"""
+        try:
+            if self.store.import_json(Config.LEGACY_DATA_FILE):
+                self.logger.info(f"📦 Migrated {Config.LEGACY_DATA_FILE} to {Config.DATABASE_FILE}")
+        except Exception as e:
+            self.logger.error(f"Error migrating {Config.LEGACY_DATA_FILE}: {e}")
+        
         try:
-            if os.path.exists('bot_data.json'):
-                with open('bot_data.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.log_chat_id = data.get('log_chat_id')
-                    self.stats = data.get('stats', self.stats)
-                    self.scan_results = data.get('scan_results', {})
-                    self.logger.info("📊 Persistent data loaded successfully")
+            self.log_chat_id = self.store.get_setting('log_chat_id')
+            self.stats.update(self.store.get_stats())
+            self.logger.info("📊 Persistent data loaded successfully")
         except Exception as e:
             self.logger.error(f"Error loading persistent data: {e}")
 
     def save_persistent_data(self):
-        """Simpan data persisten ke file"""
+        """Simpan setting dan statistik ke database"""
         try:
-            data = {
-                'log_chat_id': self.log_chat_id,
-                'stats': self.stats,
-                'scan_results': self.scan_results
-            }
-            with open('bot_data.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.store.set_setting('log_chat_id', self.log_chat_id)
+            self.store.save_stats(self.stats)
         except Exception as e:
             self.logger.error(f"Error saving persistent data: {e}")
 
@@ -128,6 +174,91 @@ class AdvancedPterodactylBackupBot:
         if not Config.ALLOWED_USERS:  # Jika list kosong, izinkan semua
             return True
         return user_id in Config.ALLOWED_USERS
+
+    def save_listing_cache(self):
+        """Simpan perubahan listing cache ke database"""
+        if self.listing_cache is None:
+            return
+        try:
+            self.listing_cache.save()
+        except Exception as e:
+            self.logger.error(f"Error saving listing cache: {e}")
+
+    def save_trace(self, scan_id: Optional[str], trace: Optional[Trace]):
+        """Simpan span trace ke database untuk /profile"""
+        if trace is None or not scan_id:
+            return
+        try:
+            self.store.save_trace_spans(scan_id, [item.as_row() for item in trace.spans])
+            if trace.dropped:
+                self.logger.warning(f"Trace {scan_id}: {trace.dropped} spans dropped (TRACE_MAX_SPANS)")
+        except Exception as e:
+            self.logger.error(f"Error saving trace for {scan_id}: {e}")
+
+    def new_scan_id(self) -> str:
+        """scan_id dari waktu mulai; diberi suffix kalau detik yang sama sudah dipakai"""
+        base = datetime.now().strftime('%Y%m%d_%H%M%S')
+        scan_id = base
+        counter = 1
+        while self.store.get_scan_status(scan_id) is not None:
+            counter += 1
+            scan_id = f"{base}_{counter}"
+        return scan_id
+
+    def checkpoint_scan(self, scan_id: str, found_files: List[Dict], server_states: Dict[str, Dict], total_servers: int):
+        """Simpan server yang baru selesai di-scan ke checkpoint"""
+        if not server_states:
+            return
+        try:
+            self.store.save_scan_progress(scan_id, found_files, server_states, total_servers)
+        except Exception as e:
+            self.logger.error("Error saving checkpoint for scan %s: %s", scan_id, e)
+
+    def format_interrupted_scan(self, scan_id: str, title: str) -> str:
+        """Ringkasan progress scan yang di-cancel atau terputus"""
+        status = self.store.get_scan_status(scan_id)
+        return (f"{title}\n\n"
+                f"🆔 Scan: `{scan_id}`\n"
+                f"✅ Server selesai (checkpoint): {status['completed_servers']}\n"
+                f"📄 Files found: {status['found_files']}\n\n"
+                f"♻️ Lanjutkan dengan tombol di bawah atau `/resume {scan_id}`")
+
+    @staticmethod
+    def resume_markup(scan_id: str) -> InlineKeyboardMarkup:
+        return InlineKeyboardMarkup([[
+            InlineKeyboardButton("♻️ Resume Scan", callback_data=f"resume_scan_{scan_id}")
+        ]])
+
+    async def post_init(self, application=None):
+        """Jalankan endpoint /metrics dan tawarkan resume scan yang terputus"""
+        if application is not None and self.log_chat_id and self.interrupted_scans:
+            scan_id = self.interrupted_scans[-1]
+            try:
+                await application.bot.send_message(
+                    chat_id=self.log_chat_id,
+                    text=self.format_interrupted_scan(scan_id, "⚠️ **Scan terputus saat bot berhenti**"),
+                    parse_mode='Markdown',
+                    reply_markup=self.resume_markup(scan_id)
+                )
+            except Exception as e:
+                self.logger.error(f"Error sending resume prompt: {e}")
+        
+        if not Config.METRICS_ENABLED:
+            return
+        try:
+            self.metrics_server = MetricsServer(self.metrics, Config.METRICS_HOST, Config.METRICS_PORT)
+            await self.metrics_server.start()
+        except OSError as e:
+            self.logger.error(f"Error starting metrics endpoint: {e}")
+            self.metrics_server = None
+
+    async def shutdown(self, application=None):
+        """Tutup koneksi HTTP saat bot berhenti"""
+        self.save_listing_cache()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        await self.api.close()
+
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler untuk command /start"""
         user_id = update.effective_user.id
@@ -188,11 +319,22 @@ Pilih opsi di bawah untuk memulai:
             await self.help_callback(query, context)
         elif query.data == "start_backup":
             await self.backup_callback(query, context)
+        elif query.data.startswith("start_backup_"):
+            scan_id = query.data.replace("start_backup_", "")
+            await self.backup_callback(query, context, scan_id)
         elif query.data.startswith("confirm_backup_"):
             scan_id = query.data.replace("confirm_backup_", "")
             await self.confirm_backup_callback(query, context, scan_id)
         elif query.data == "cancel_backup":
             await self.cancel_backup_callback(query, context)
+        elif query.data == "cancel_job":
+            await self.cancel_job_callback(query, context)
+        elif query.data.startswith("cancel_scan_"):
+            scan_id = query.data.replace("cancel_scan_", "")
+            await self.cancel_scan_callback(query, context, scan_id)
+        elif query.data.startswith("resume_scan_"):
+            scan_id = query.data.replace("resume_scan_", "")
+            await self.resume_scan_callback(query, context, scan_id)
     async def setup_log_callback(self, query, context):
         """Setup chat log melalui callback"""
         self.log_chat_id = query.message.chat_id
@@ -215,6 +357,11 @@ Pilih opsi di bawah untuk memulai:
             )
             return
         
+        busy = self.scheduled_job_running()
+        if busy:
+            await query.edit_message_text(busy)
+            return
+        
         await query.edit_message_text("🔍 Memulai quick scan...")
         await self.perform_scan(query, context, quick_mode=True)
 
@@ -262,6 +409,9 @@ Pilih opsi di bawah untuk memulai:
 • `/scan` - Scan lengkap semua server
 • `/stats` - Statistik penggunaan
 • `/clean` - Bersihkan cache scan
+• `/jobs` - Jadwal scan otomatis
+• `/profile <scan_id>` - Breakdown waktu scan (butuh TRACING_ENABLED)
+• `/resume [scan_id]` - Lanjutkan scan yang di-cancel/terputus
 
 **🔄 Workflow Normal:**
 1. Setup chat log di menu utama
@@ -283,274 +433,658 @@ Pilih opsi di bawah untuk memulai:
         
         await query.edit_message_text(help_msg, parse_mode='Markdown')
 
-    async def get_servers_async(self) -> List[Dict]:
-        """Get servers secara asynchronous"""
+    async def get_servers_async(self) -> AsyncIterator[Dict]:
+        """Stream semua server dari application API, halaman demi halaman.
+
+        Mengikuti ``meta.pagination`` sampai halaman terakhir. Halaman
+        berikutnya sudah di-request sebelum server di halaman sekarang
+        di-yield, jadi scan bisa jalan sambil halaman berikutnya di-download.
+        Total server (kalau diketahui) disimpan di ``self.inventory_total``.
+        
+        Halaman pertama yang gagal berarti tidak ada server sama sekali;
+        halaman berikutnya yang gagal di-raise supaya inventory yang baru
+        sebagian tidak tersimpan sebagai scan lengkap.
+        """
+        self.inventory_total = None
+        page = 1
+        next_page = asyncio.ensure_future(self.fetch_servers_page(page))
+        
+        try:
+            while next_page is not None:
+                data = await next_page
+                next_page = None
+                
+                if data is None:
+                    if page > 1:
+                        raise RuntimeError(f"Gagal mengambil daftar server halaman {page}")
+                    return
+                
+                pagination = data.get('meta', {}).get('pagination', {})
+                current_page = pagination.get('current_page', 1)
+                total_pages = pagination.get('total_pages', current_page)
+                self.inventory_total = pagination.get('total', self.inventory_total)
+                
+                # Prefetch halaman berikutnya selagi halaman ini diproses
+                if current_page < total_pages:
+                    page = current_page + 1
+                    next_page = asyncio.ensure_future(self.fetch_servers_page(page))
+                
+                for server in data['data']:
+                    attributes = server['attributes']
+                    self.server_nodes[attributes['identifier']] = attributes.get('node')
+                    yield server
+        finally:
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+
+    async def fetch_servers_page(self, page: int) -> Optional[Dict]:
+        """Ambil satu halaman daftar server"""
         try:
-            url = f"{self.domain}/api/application/servers"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            with span('server_list', name=f"page {page}"):
+                response = await send_with_retry(
+                    lambda: self.api.list_servers(page, Config.SERVER_LIST_PAGE_SIZE),
+                    self.retry_policy
+                )
             
             if response.status_code == 200:
-                data = response.json()
-                return data['data']
+                return response.json()
             else:
-                self.logger.error(f"Error getting servers: {response.status_code}")
-                return []
+                self.logger.error("Error getting servers (page %s): %s", page, response.status_code,
+                                  extra={'status': response.status_code})
+                return None
         except Exception as e:
-            self.logger.error(f"Exception getting servers: {e}")
-            return []
+            self.logger.error("Exception getting servers (page %s): %s", page, e)
+            return None
 
-    def run_scan_server_sync(self, server_id: str, server_name: str) -> List[Dict]:
-        """Synchronous wrapper untuk scan server - digunakan di ThreadPoolExecutor"""
+    async def classify_servers(self, servers: List[Dict]) -> List[Tuple[Dict, str]]:
+        """Klasifikasi server sebelum scan: 'scan', 'defer' (scan terakhir), atau 'skip'.
+        
+        Suspended dan status install/restore dari application API dilewati
+        tanpa request sama sekali. Kalau SCAN_RESOURCE_PROBE aktif, sisa
+        server di-probe paralel lewat /resources; yang offline atau tidak
+        menjawab tetap di-scan (file-nya masih bisa dibaca), tapi paling akhir.
+        """
+        results = []
+        to_probe = []
+        
+        for server in servers:
+            attributes = server['attributes']
+            if Config.SCAN_SKIP_SUSPENDED and (
+                    attributes.get('suspended') or attributes.get('status') in SKIPPED_SERVER_STATUS):
+                self.logger.debug("⏭️ %s: %s - skipping", attributes['name'], attributes.get('status') or 'suspended',
+                                  extra={'server_id': attributes['identifier']})
+                results.append((server, 'skip'))
+            elif Config.SCAN_RESOURCE_PROBE:
+                to_probe.append(server)
+            else:
+                results.append((server, 'scan'))
+        
+        if to_probe:
+            states = await asyncio.gather(
+                *(self.get_server_state_async(server['attributes']['identifier']) for server in to_probe)
+            )
+            for server, state in zip(to_probe, states):
+                results.append((server, 'scan' if state in ACTIVE_SERVER_STATES else 'defer'))
+        
+        return results
+
+    async def get_server_state_async(self, server_id: str) -> Optional[str]:
+        """current_state dari /resources (running, offline, ...), None kalau gagal"""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.scan_server_files(server_id, server_name))
-            loop.close()
-            return result
+            response = await self.client_request(server_id, lambda: self.api.get_resources(server_id, timeout=10))
+            if response.status_code == 200:
+                return response.json()['attributes'].get('current_state')
+            return None
         except Exception as e:
-            self.logger.error(f"Error in sync wrapper for server {server_name}: {e}")
-            return []
-    async def scan_server_files(self, server_id: str, server_name: str) -> List[Dict]:
+            self.logger.debug("Server %s: Resource probe failed - %s", server_id, e, extra={'server_id': server_id})
+            return None
+
+    async def scan_server_files(self, server_id: str, server_name: str,
+                                root_files: Optional[List[Dict]] = None) -> List[Dict]:
         """Scan files in a server with improved error handling"""
         found_files = []
         
         try:
-            self.logger.info(f"🔍 Scanning: {server_name}")
+            self.logger.info("🔍 Scanning: %s", server_name, extra={'server_id': server_id})
             
             # Quick health check - try to get root files
-            files = await self.get_server_files_async(server_id, "/")
+            files = root_files if root_files is not None else await self.get_server_files_async(server_id, "/")
             
             if not files:
-                self.logger.info(f"⚪ {server_name}: No files or server inaccessible - skipping")
+                self.logger.info("⚪ %s: No files or server inaccessible - skipping", server_name,
+                                 extra={'server_id': server_id})
                 return found_files
             
             # Scan for target files
-            target_found_in_root = False
-            for file_item in files:
-                if (file_item['attributes']['is_file'] and 
-                    file_item['attributes']['name'] == self.target_filename):
-                    
-                    found_files.append({
-                        'server_id': server_id,
-                        'server_name': server_name,
-                        'file_path': file_item['attributes']['name'],
-                        'directory': '/',
-                        'size': file_item['attributes']['size'],
-                        'modified_at': file_item['attributes']['modified_at']
-                    })
-                    
-                    target_found_in_root = True
-                    self.logger.info(f"✅ {server_name}: Found {self.target_filename} in root directory")
+            found_files.extend(self.collect_target_files(server_id, server_name, "/", files))
+            target_found_in_root = bool(found_files)
+            
+            if target_found_in_root:
+                self.logger.info("✅ %s: Found %s in root directory", server_name, self.target_filename,
+                                 extra={'server_id': server_id, 'path': '/'})
             
-            # Only scan subdirectories if enabled and no target found in root
-            if self.scan_subdirs and not target_found_in_root and files:
+            # Scan subdirectories if enabled (kecuali target sudah ketemu di root dan SCAN_STOP_AT_FIRST_MATCH)
+            if self.scan_subdirs and not (target_found_in_root and Config.SCAN_STOP_AT_FIRST_MATCH):
                 try:
-                    self.logger.debug(f"🔍 {server_name}: Scanning subdirectories...")
-                    subdirs_found = await self.scan_subdirectories(server_id, server_name, files, depth=1)
+                    self.logger.debug("🔍 %s: Scanning subdirectories...", server_name, extra={'server_id': server_id})
+                    subdirs_found = await self.scan_subdirectories(server_id, server_name, "/", files)
                     found_files.extend(subdirs_found)
                     
                     if subdirs_found:
-                        self.logger.info(f"✅ {server_name}: Found {len(subdirs_found)} files in subdirectories")
+                        self.logger.info("✅ %s: Found %d files in subdirectories", server_name, len(subdirs_found),
+                                         extra={'server_id': server_id})
                         
                 except Exception as e:
-                    self.logger.debug(f"⚠️ {server_name}: Error scanning subdirectories: {str(e)[:50]}...")
+                    self.logger.debug("⚠️ %s: Error scanning subdirectories: %.50s...", server_name, e,
+                                      extra={'server_id': server_id})
             
             # Final result
             if found_files:
-                self.logger.info(f"🎯 {server_name}: Total {len(found_files)} target files found")
+                self.logger.info("🎯 %s: Total %d target files found", server_name, len(found_files),
+                                 extra={'server_id': server_id})
             else:
-                self.logger.debug(f"📭 {server_name}: No {self.target_filename} files found")
+                self.logger.debug("📭 %s: No %s files found", server_name, self.target_filename,
+                                  extra={'server_id': server_id})
         
         except Exception as e:
-            self.logger.error(f"❌ {server_name}: Scan failed - {str(e)[:50]}...")
+            self.logger.error("❌ %s: Scan failed - %.50s...", server_name, e, extra={'server_id': server_id})
             
         return found_files
 
-    async def scan_subdirectories(self, server_id: str, server_name: str, 
-                                files: List[Dict], depth: int) -> List[Dict]:
-        """Recursively scan subdirectories"""
-        found_files = []
+    @staticmethod
+    def listing_fingerprint(files: List[Dict]) -> str:
+        """Fingerprint listing direktori dari nama, tipe, ukuran, dan mtime entry"""
+        entries = sorted(
+            (item['attributes']['name'], item['attributes']['is_file'],
+             item['attributes'].get('size'), item['attributes'].get('modified_at'))
+            for item in files
+        )
+        return hashlib.sha1(json.dumps(entries).encode('utf-8')).hexdigest()
+
+    async def scan_server(self, server: Dict, previous: Optional[Dict] = None) -> Tuple[List[Dict], Dict]:
+        """Scan satu server, incremental kalau ada state dari scan sebelumnya.
+
+        Root listing selalu diambil untuk fingerprint. Kalau ``updated_at``
+        dari application API dan fingerprint root sama dengan scan
+        sebelumnya, hasil lama dipakai ulang tanpa full walk. Return
+        ``(found_files, state)``; ``state`` disimpan untuk scan berikutnya,
+        atau None kalau root listing gagal (server dihitung gagal).
+        """
+        attributes = server['attributes']
+        server_id = attributes['identifier']
+        server_name = attributes['name']
+        
+        files = await self.get_server_files_async(server_id, "/")
+        if files is None:
+            return [], None
+        
+        state = {
+            'server_id': server_id,
+            'updated_at': attributes.get('updated_at'),
+            'fingerprint': self.listing_fingerprint(files) if files else None,
+            'reused': False
+        }
         
-        if depth > self.max_depth:
-            return found_files
+        if (previous and files and
+                previous.get('updated_at') == state['updated_at'] and
+                previous.get('fingerprint') == state['fingerprint']):
+            self.logger.debug("♻️ %s: Unchanged since last scan - reusing results", server_name,
+                              extra={'server_id': server_id})
+            state['reused'] = True
+            found_files = [dict(file_info, server_name=server_name) for file_info in previous['found_files']]
+            return found_files, state
+        
+        found_files = await self.scan_server_files(server_id, server_name, root_files=files)
+        return found_files, state
+
+    async def scan_server_with_timeout(self, server: Dict,
+                                       previous: Optional[Dict] = None) -> Tuple[str, List[Dict], bool, Optional[Dict]]:
+        """Scan satu server dengan batas waktu SCAN_TIMEOUT"""
+        server_name = server['attributes']['name']
+        try:
+            with span('scan_server', server['attributes']['identifier'], server_name):
+                found_files, state = await asyncio.wait_for(
+                    self.scan_server(server, previous),
+                    timeout=self.scan_timeout
+                )
+            # Root listing gagal: jangan di-checkpoint supaya dicoba lagi saat resume
+            return server_name, found_files, state is not None, state
+        except asyncio.TimeoutError:
+            self.logger.warning("⏱️ %s: Scan timeout after %ss - skipping", server_name, self.scan_timeout,
+                                extra={'server_id': server['attributes']['identifier']})
+            return server_name, [], False, None
+        except Exception as e:
+            self.logger.error("❌ %s: %.50s...", server_name, e, extra={'server_id': server['attributes']['identifier']})
+            return server_name, [], False, None
+
+    def get_previous_server_states(self) -> Dict[str, Dict]:
+        """State per server dari scan terakhir, untuk incremental scan"""
+        scan_id = self.store.get_latest_scan_with_state()
+        if scan_id is None:
+            return {}
+        
+        states = {
+            server_id: dict(state, found_files=[])
+            for server_id, state in self.store.get_server_states(scan_id).items()
+        }
+        for file_info in self.store.get_found_files(scan_id):
+            if file_info['server_id'] in states:
+                states[file_info['server_id']]['found_files'].append(file_info)
+        
+        return states
+
+    def collect_target_files(self, server_id: str, server_name: str,
+                             directory: str, files: List[Dict]) -> List[Dict]:
+        """Ambil target file dari satu listing direktori"""
+        found_files = []
         
         for file_item in files:
-            if not file_item['attributes']['is_file']:  # It's a directory
-                subdir_path = file_item['attributes']['name']
-                
-                try:
-                    subfiles = await self.get_server_files_async(server_id, f"/{subdir_path}")
-                    
-                    for subfile in subfiles:
-                        if (subfile['attributes']['is_file'] and 
-                            subfile['attributes']['name'] == self.target_filename):
-                            
-                            found_files.append({
-                                'server_id': server_id,
-                                'server_name': server_name,
-                                'file_path': f"{subdir_path}/{subfile['attributes']['name']}",
-                                'directory': f"/{subdir_path}",
-                                'size': subfile['attributes']['size'],
-                                'modified_at': subfile['attributes']['modified_at']
-                            })
-                    
-                    # Recursive scan
-                    if depth < self.max_depth:
-                        found_files.extend(
-                            await self.scan_subdirectories(
-                                server_id, server_name, subfiles, depth + 1
-                            )
-                        )
-                
-                except Exception as e:
-                    self.logger.warning(f"Error scanning subdirectory {subdir_path}: {e}")
+            attributes = file_item['attributes']
+            if attributes['is_file'] and attributes['name'] == self.target_filename:
+                found_files.append({
+                    'server_id': server_id,
+                    'server_name': server_name,
+                    'file_path': self.join_path(directory, attributes['name']).lstrip('/'),
+                    'directory': directory,
+                    'size': attributes['size'],
+                    'modified_at': attributes['modified_at']
+                })
         
         return found_files
-    async def get_server_files_async(self, server_id: str, path: str = "/") -> List[Dict]:
-        """Get files from server asynchronously with improved error handling"""
-        max_retries = 2  # Reduce retries for faster scanning
-        retry_delay = 3  # Reduce delay
+
+    @staticmethod
+    def join_path(directory: str, name: str) -> str:
+        """Gabungkan path direktori absolut dengan nama entry"""
+        return f"{directory.rstrip('/')}/{name}"
+
+    async def scan_subdirectories(self, server_id: str, server_name: str,
+                                  root: str, files: List[Dict]) -> List[Dict]:
+        """Breadth-first scan subdirectories sampai MAX_SCAN_DEPTH.
+
+        Semua direktori di satu level di-list paralel, dibatasi
+        MAX_DIR_LISTINGS_PER_SERVER request sekaligus per server, jadi waktu
+        scan sebanding dengan kedalaman tree, bukan jumlah direktori.
+        """
+        found_files = []
+        semaphore = asyncio.Semaphore(max(1, Config.MAX_DIR_LISTINGS_PER_SERVER))
+        
+        async def list_directory(path: str, dir_mtime: Optional[str]) -> List[Dict]:
+            # Direktori yang tidak berubah diambil dari cache tanpa makan slot request
+            if self.listing_cache is not None:
+                cached = self.listing_cache.get(server_id, path, dir_mtime)
+                if cached is not None:
+                    return cached
+            async with semaphore:
+                subfiles = await self.get_server_files_async(server_id, path, dir_mtime)
+            return subfiles if subfiles is not None else []
+        
+        # Frontier berisi (path, modified_at) direktori dari listing parent
+        frontier = [
+            (self.join_path(root, item['attributes']['name']), item['attributes'].get('modified_at'))
+            for item in files if not item['attributes']['is_file']
+        ]
+        depth = 1
         
-        for attempt in range(max_retries):
-            try:
-                url = f"{self.domain}/api/client/servers/{server_id}/files/list"
-                
-                # Prepare parameters
-                params = {}
-                if path != "/":
-                    params['directory'] = path
-                
-                self.logger.debug(f"Server {server_id}: Getting files from '{path}' (attempt {attempt + 1})")
+        while frontier and depth <= self.max_depth:
+            listings = await asyncio.gather(
+                *(list_directory(path, dir_mtime) for path, dir_mtime in frontier),
+                return_exceptions=True
+            )
+            
+            next_frontier = []
+            level_found = []
+            
+            for (path, _), subfiles in zip(frontier, listings):
+                if isinstance(subfiles, Exception):
+                    self.logger.warning("Error scanning subdirectory %s: %s", path, subfiles,
+                                        extra={'server_id': server_id, 'path': path})
+                    continue
                 
-                response = requests.get(
-                    url, 
-                    headers=self.client_headers, 
-                    params=params,
-                    timeout=15  # Reduce timeout
+                level_found.extend(self.collect_target_files(server_id, server_name, path, subfiles))
+                next_frontier.extend(
+                    (self.join_path(path, item['attributes']['name']), item['attributes'].get('modified_at'))
+                    for item in subfiles if not item['attributes']['is_file']
                 )
+            
+            found_files.extend(level_found)
+            
+            # Berhenti turun begitu target ketemu kalau dikonfigurasi begitu
+            if level_found and Config.SCAN_STOP_AT_FIRST_MATCH:
+                break
+            
+            frontier = next_frontier
+            depth += 1
+        
+        return found_files
+
+    async def get_server_files_async(self, server_id: str, path: str = "/",
+                                     dir_mtime: Optional[str] = None) -> Optional[List[Dict]]:
+        """Get files from server asynchronously with improved error handling.
+
+        ``dir_mtime`` adalah modified_at direktori dari listing parent; kalau
+        diisi, listing yang berhasil disimpan ke listing cache. Retry dan
+        circuit breaker ditangani ``client_request``. Path yang tidak ada
+        menghasilkan list kosong; None berarti listing gagal (offline,
+        timeout, error, node down).
+        """
+        log_fields = {'server_id': server_id, 'path': path}
+        try:
+            self.logger.debug("Server %s: Getting files from '%s'", server_id, path, extra=log_fields)
+            
+            with span('list_directory', server_id, path):
+                response = await self.client_request(
+                    server_id, lambda: self.api.list_files(server_id, path, timeout=15)
+                )
+            log_fields.update(status=response.status_code, latency=round(response.elapsed.total_seconds(), 4))
+            
+            if response.status_code == 200:
+                data = response.json()
+                self.logger.debug("Server %s: Success, found %d items", server_id, len(data['data']), extra=log_fields)
+                if self.listing_cache is not None:
+                    self.listing_cache.put(server_id, path, data['data'], dir_mtime)
+                return data['data']
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    self.logger.debug(f"Server {server_id}: Success, found {len(data['data'])} items")
-                    return data['data']
-                    
-                elif response.status_code == 500:
-                    self.logger.warning(f"Server {server_id}: Server error 500 (attempt {attempt + 1}/{max_retries})")
-                    if attempt == 0:  # Only retry once for 500 errors
-                        await asyncio.sleep(retry_delay)
-                        continue
-                    else:
-                        self.logger.info(f"Server {server_id}: Skipping - server appears offline or misconfigured")
-                        return []
-                        
-                elif response.status_code == 404:
-                    self.logger.debug(f"Server {server_id}: Path '{path}' not found - empty directory")
-                    return []
-                    
-                elif response.status_code == 403:
-                    self.logger.warning(f"Server {server_id}: Access forbidden - insufficient permissions")
-                    return []
-                    
-                elif response.status_code == 502 or response.status_code == 503:
-                    self.logger.info(f"Server {server_id}: Service unavailable ({response.status_code}) - skipping")
-                    return []
-                    
-                else:
-                    self.logger.warning(f"Server {server_id}: HTTP {response.status_code} - skipping")
-                    return []
-                    
-            except requests.exceptions.Timeout:
-                self.logger.info(f"Server {server_id}: Timeout - server may be slow or unresponsive")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2)
-                    continue
-                return []
+            elif response.status_code == 500:
+                self.logger.info("Server %s: Skipping - server appears offline or misconfigured", server_id, extra=log_fields)
+                return None
                 
-            except requests.exceptions.ConnectionError:
-                self.logger.info(f"Server {server_id}: Connection failed - server may be offline")
+            elif response.status_code == 404:
+                self.logger.debug("Server %s: Path '%s' not found - empty directory", server_id, path, extra=log_fields)
                 return []
                 
-            except Exception as e:
-                self.logger.error(f"Server {server_id}: Unexpected error - {str(e)[:100]}")
-                return []
+            elif response.status_code == 403:
+                self.logger.warning("Server %s: Access forbidden - insufficient permissions", server_id, extra=log_fields)
+                return None
+                
+            elif response.status_code == 502 or response.status_code == 503:
+                self.logger.info("Server %s: Service unavailable (%s) - skipping", server_id, response.status_code,
+                                 extra=log_fields)
+                return None
+                
+            else:
+                self.logger.warning("Server %s: HTTP %s - skipping", server_id, response.status_code, extra=log_fields)
+                return None
+        
+        except CircuitOpenError as e:
+            self.logger.debug("Server %s: %s is down - skipping", server_id, e, extra=log_fields)
+            return None
+                
+        except httpx.TimeoutException:
+            self.logger.info("Server %s: Timeout - server may be slow or unresponsive", server_id, extra=log_fields)
+            return None
+            
+        except httpx.TransportError:
+            self.logger.info("Server %s: Connection failed - server may be offline", server_id, extra=log_fields)
+            return None
+            
+        except Exception as e:
+            self.logger.error("Server %s: Unexpected error - %.100s", server_id, e, extra=log_fields)
+            return None
+
+    def node_key(self, server_id: str) -> Optional[str]:
+        """Key circuit breaker untuk node tempat server berada"""
+        node = self.server_nodes.get(server_id)
+        return f"node {node}" if node is not None else None
+
+    async def client_request(self, server_id: str, send) -> httpx.Response:
+        """Request client API ke satu server lewat retry policy dan circuit breaker node-nya.
+        
+        Setiap percobaan juga memakai satu slot MAX_REQUESTS_PER_NODE dari
+        node server itu, jadi satu daemon Wings tidak menerima lebih dari
+        itu request sekaligus dari bot. Hasil tiap percobaan dicatat per
+        node di metrics (ok / error / circuit_open).
+        """
+        node = self.server_nodes.get(server_id)
+        node_label = str(node) if node is not None else 'unknown'
         
-        return []
+        async def counted_send():
+            try:
+                response = await send()
+            except (httpx.TimeoutException, httpx.TransportError):
+                self.metrics.node_requests.inc(node=node_label, outcome='error')
+                raise
+            outcome = 'error' if response.status_code >= 500 else 'ok'
+            self.metrics.node_requests.inc(node=node_label, outcome=outcome)
+            return response
+        
+        if node is None:
+            return await send_with_retry(counted_send, self.retry_policy, self.node_breaker, None)
+        
+        semaphore = self.node_semaphores[node]
+        
+        async def limited_send():
+            async with semaphore:
+                return await counted_send()
+        
+        try:
+            return await send_with_retry(limited_send, self.retry_policy, self.node_breaker, self.node_key(server_id))
+        except CircuitOpenError:
+            self.metrics.node_requests.inc(node=node_label, outcome='circuit_open')
+            raise
 
-    async def perform_scan(self, update_obj, context, quick_mode=False):
-        """Perform comprehensive scan"""
-        self.logger.info("Starting server scan...")
+    async def perform_scan(self, update_obj, context, quick_mode=False, resume_scan_id=None):
+        """Perform comprehensive scan.
+
+        ``quick_mode`` menjalankan incremental scan: server yang tidak berubah
+        sejak scan terakhir tidak di-walk ulang. Return scan_id kalau scan
+        selesai.
+        
+        Server dari inventory diantrikan per node (NodeScheduler) dan
+        dijalankan bergiliran antar node, maksimal MAX_SERVERS_PER_NODE
+        server per node; total server sekaligus ikut naik dengan jumlah node
+        (dibatasi MAX_CONCURRENT_SCANS kalau diisi). Request per node
+        dibatasi terpisah oleh MAX_REQUESTS_PER_NODE di ``client_request``.
+        
+        Sebelum masuk antrian server disaring dulu (``classify_servers``):
+        suspended/installing dilewati, yang offline di-scan paling akhir.
+        
+        Server yang selesai di-checkpoint ke database selama scan berjalan.
+        Scan bisa di-cancel lewat tombol di pesan progress, dan scan yang
+        di-cancel atau terputus (crash/restart) dilanjutkan dengan
+        ``resume_scan_id``: server yang sudah selesai tidak di-scan ulang.
+        """
+        if resume_scan_id:
+            scan_id = resume_scan_id
+            quick_mode = bool(self.store.get_scan_status(scan_id)['quick_mode'])
+            self.store.set_scan_status(scan_id, 'running')
+        else:
+            scan_id = self.new_scan_id()
+            self.store.start_scan(scan_id, quick_mode)
+        
+        self.logger.info(f"{'Resuming' if resume_scan_id else 'Starting'} "
+                         f"{'incremental' if quick_mode else 'full'} server scan {scan_id}...")
+        scan_mode = 'incremental' if quick_mode else 'full'
+        scan_started = time.monotonic()
+        
+        # Semua span dari scan ini (termasuk task turunannya) masuk ke trace ini
+        trace = Trace(Config.TRACE_MAX_SPANS) if Config.TRACING_ENABLED else None
+        trace_token = current_trace.set(trace)
         
         # Update stats
         self.stats['total_scans'] += 1
         self.stats['last_scan'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
+        reporter = ProgressReporter(update_obj, Config.PROGRESS_UPDATE_INTERVAL)
+        cancel_markup = InlineKeyboardMarkup([[
+            InlineKeyboardButton("⛔ Cancel Scan", callback_data=f"cancel_scan_{scan_id}")
+        ]])
+        self.active_scans[scan_id] = asyncio.current_task()
+        
+        # Hasil server yang sudah selesai sebelum scan ini di-cancel/terputus
+        server_states = self.store.get_server_states(scan_id) if resume_scan_id else {}
+        all_found_files = self.store.get_found_files(scan_id) if resume_scan_id else []
+        completed_servers = set(server_states)
+        scan_saved = False
+        
         try:
-            # Get servers
-            servers = await self.get_servers_async()
-            
-            if not servers:
-                await update_obj.edit_message_text("❌ Tidak dapat mengambil daftar server.")
-                return
+            reporter.update("🔍 Mengambil daftar server...", reply_markup=cancel_markup)
             
-            # Progress message
-            progress_msg = f"🔍 Scanning {len(servers)} servers...\n\n"
-            await update_obj.edit_message_text(progress_msg)
-            
-            # Sequential scanning untuk menghindari masalah concurrency
-            all_found_files = []
-            successful_scans = 0
+            successful_scans = len(completed_servers)
             failed_scans = 0
+            reused_scans = 0
+            skipped_servers = 0
+            deferred_servers = 0
+            total_servers = 0
+            pending = set()
+            previous_states = self.get_previous_server_states() if quick_mode else {}
             
-            for i, server in enumerate(servers, 1):
-                server_id = server['attributes']['identifier']
-                server_name = server['attributes']['name']
+            async def collect(done_tasks):
+                nonlocal successful_scans, failed_scans, reused_scans
+                checkpoint_files = []
+                checkpoint_states = {}
                 
-                try:
-                    # Update progress with server status
-                    progress = (i / len(servers)) * 100
-                    progress_msg = f"🔍 Scanning {i}/{len(servers)} servers\n"
-                    progress_msg += f"📊 Progress: {progress:.1f}%\n"
-                    progress_msg += f"📄 Files found: {len(all_found_files)}\n"
-                    progress_msg += f"✅ Success: {successful_scans} | ❌ Failed: {failed_scans}\n"
-                    progress_msg += f"🖥️ Current: {server_name[:25]}..."
-                    
-                    await update_obj.edit_message_text(progress_msg)
-                    
-                    # Scan server
-                    found_files = await self.scan_server_files(server_id, server_name)
+                for task in done_tasks:
+                    server_name, found_files, ok, state = task.result()
                     all_found_files.extend(found_files)
                     
-                    # Update counters
-                    if found_files or not found_files:  # Always count as successful if no exception
+                    if ok:
                         successful_scans += 1
+                        server_id = state.pop('server_id')
+                        server_states[server_id] = checkpoint_states[server_id] = state
+                        checkpoint_files.extend(found_files)
+                        if state.pop('reused'):
+                            reused_scans += 1
                         if found_files:
-                            self.logger.info(f"✅ {server_name}: {len(found_files)} files")
+                            self.logger.info("✅ %s: %d files", server_name, len(found_files))
                         else:
-                            self.logger.debug(f"⚪ {server_name}: no target files")
+                            self.logger.debug("⚪ %s: no target files", server_name)
+                    else:
+                        failed_scans += 1
+                
+                # Server yang gagal tidak di-checkpoint, jadi dicoba lagi saat resume
+                self.checkpoint_scan(scan_id, checkpoint_files, checkpoint_states, total_servers)
+                # Listing baru ditulis sedikit-sedikit, bukan sekaligus di akhir scan
+                self.save_listing_cache()
+                
+                # Update progress with server status
+                reporter.update(format_scan_progress(
+                    successful_scans + failed_scans + skipped_servers,
+                    self.inventory_total or total_servers,
+                    len(all_found_files),
+                    successful_scans,
+                    failed_scans,
+                    len(pending)
+                ), reply_markup=cancel_markup)
+            
+            scheduler = NodeScheduler(Config.MAX_SERVERS_PER_NODE)
+            
+            async def enqueue(batch):
+                nonlocal skipped_servers, deferred_servers
+                batch = [server for server in batch if server['attributes']['identifier'] not in completed_servers]
+                for server, status in await self.classify_servers(batch):
+                    if status == 'skip':
+                        skipped_servers += 1
+                        continue
+                    if status == 'defer':
+                        deferred_servers += 1
+                    scheduler.add(server['attributes'].get('node'), server, low_priority=(status == 'defer'))
+                
+                # Cukup banyak server di antrian supaya tiap node selalu kebagian
+                while len(scheduler) >= max(scheduler.capacity(Config.MAX_CONCURRENT_SCANS) * 4,
+                                            Config.SERVER_LIST_PAGE_SIZE):
+                    scheduler.space_available.clear()
+                    await scheduler.space_available.wait()
+            
+            async def feed_inventory():
+                nonlocal total_servers
+                # Server dikumpulkan per batch supaya probe /resources bisa jalan paralel
+                batch_size = max(1, Config.RESOURCE_PROBE_BATCH) if Config.SCAN_RESOURCE_PROBE else 1
+                batch = []
+                async for server in self.get_servers_async():
+                    total_servers += 1
+                    batch.append(server)
+                    if len(batch) >= batch_size:
+                        await enqueue(batch)
+                        batch = []
+                if batch:
+                    await enqueue(batch)
+            
+            async def scan_on_node(node, server):
+                try:
+                    server_id = server['attributes']['identifier']
+                    return await self.scan_server_with_timeout(server, previous_states.get(server_id))
+                finally:
+                    scheduler.release(node)
+            
+            feeder = asyncio.create_task(feed_inventory())
+            try:
+                while True:
+                    # Isi slot kosong dengan server dari node berikutnya dalam rotasi
+                    # Kapasitas naik begitu inventory memperlihatkan node baru
+                    while len(pending) < scheduler.capacity(Config.MAX_CONCURRENT_SCANS):
+                        item = scheduler.pop()
+                        if item is None:
+                            break
+                        pending.add(asyncio.create_task(scan_on_node(*item)))
                     
-                except Exception as e:
-                    failed_scans += 1
-                    self.logger.error(f"❌ {server_name}: {str(e)[:50]}...")
-                    # Continue with next server instead of stopping
+                    if feeder.done() and not pending:
+                        break
+                    
+                    waiters = set(pending)
+                    wakeup = None
+                    if not feeder.done():
+                        scheduler.work_available.clear()
+                        wakeup = asyncio.create_task(scheduler.work_available.wait())
+                        waiters |= {feeder, wakeup}
+                    
+                    done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                    if wakeup is not None:
+                        wakeup.cancel()
+                    
+                    finished = done & pending
+                    if finished:
+                        pending -= finished
+                        await collect(finished)
+                
+                # Error dari inventory (kalau ada) dilempar ke except di bawah
+                feeder.result()
+            finally:
+                feeder.cancel()
+                for task in pending:
+                    task.cancel()
+            
+            if not total_servers:
+                self.metrics.scans.inc(mode=scan_mode, outcome='error')
+                self.store.set_scan_status(scan_id, 'failed')
+                await reporter.finish("❌ Tidak dapat mengambil daftar server.")
+                return
             
             # Save scan results
-            scan_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-            self.scan_results[scan_id] = {
+            self.store.save_scan(scan_id, {
                 'timestamp': datetime.now().isoformat(),
                 'found_files': all_found_files,
-                'total_servers': len(servers),
-                'quick_mode': quick_mode
-            }
+                'total_servers': total_servers,
+                'quick_mode': quick_mode,
+                'server_state': server_states
+            })
+            scan_saved = True
+            self.save_trace(scan_id, trace)
             
             self.save_persistent_data()
+            self.save_listing_cache()
+            
+            self.metrics.scan_duration.observe(time.monotonic() - scan_started, mode=scan_mode)
+            self.metrics.scans.inc(mode=scan_mode, outcome='ok')
+            self.metrics.servers_scanned.inc(successful_scans - len(completed_servers), result='ok')
+            self.metrics.servers_scanned.inc(failed_scans, result='failed')
+            self.metrics.servers_scanned.inc(skipped_servers, result='skipped')
+            self.metrics.files_found.inc(len(all_found_files))
             
             # Generate results message
             if all_found_files:
                 result_msg = f"✅ **Scan Completed Successfully!**\n\n"
                 result_msg += f"📊 **Statistics:**\n"
-                result_msg += f"• Servers scanned: {len(servers)}\n"
+                result_msg += f"• Servers scanned: {total_servers}\n"
                 result_msg += f"• Successful: {successful_scans}\n"
                 result_msg += f"• Failed/Offline: {failed_scans}\n"
+                if skipped_servers:
+                    result_msg += f"• Skipped (suspended/installing): {skipped_servers}\n"
+                if deferred_servers:
+                    result_msg += f"• Offline (scanned last): {deferred_servers}\n"
+                if quick_mode:
+                    result_msg += f"• Unchanged (reused): {reused_scans}\n"
+                if completed_servers:
+                    result_msg += f"• Resumed from checkpoint: {len(completed_servers)}\n"
                 result_msg += f"• Target files found: {len(all_found_files)}\n\n"
                 result_msg += f"📁 **Found Files:**\n"
                 
@@ -563,18 +1097,28 @@ Pilih opsi di bawah untuk memulai:
                     result_msg += f"... and {len(all_found_files) - 8} more files\n\n"
                 
                 # Add backup button
-                keyboard = [[InlineKeyboardButton("🚀 Start Backup", callback_data="start_backup")]]
+                keyboard = [[InlineKeyboardButton("🚀 Start Backup", callback_data=f"start_backup_{scan_id}")]]
                 reply_markup = InlineKeyboardMarkup(keyboard)
                 
-                context.user_data['current_scan_id'] = scan_id
+                # Job terjadwal tidak punya user_data
+                if context.user_data is not None:
+                    context.user_data['current_scan_id'] = scan_id
                 
             else:
                 result_msg = f"📋 **Scan Completed**\n\n"
                 result_msg += f"📊 **Statistics:**\n"
-                result_msg += f"• Servers scanned: {len(servers)}\n"
+                result_msg += f"• Servers scanned: {total_servers}\n"
                 result_msg += f"• Successful: {successful_scans}\n"
-                result_msg += f"• Failed/Offline: {failed_scans}\n\n"
-                result_msg += f"❌ No `{self.target_filename}` files found.\n\n"
+                result_msg += f"• Failed/Offline: {failed_scans}\n"
+                if skipped_servers:
+                    result_msg += f"• Skipped (suspended/installing): {skipped_servers}\n"
+                if deferred_servers:
+                    result_msg += f"• Offline (scanned last): {deferred_servers}\n"
+                if quick_mode:
+                    result_msg += f"• Unchanged (reused): {reused_scans}\n"
+                if completed_servers:
+                    result_msg += f"• Resumed from checkpoint: {len(completed_servers)}\n"
+                result_msg += f"\n❌ No `{self.target_filename}` files found.\n\n"
                 result_msg += f"💡 **Possible reasons:**\n"
                 result_msg += f"• Files don't exist on servers\n"
                 result_msg += f"• Servers are offline/inaccessible\n"
@@ -582,26 +1126,51 @@ Pilih opsi di bawah untuk memulai:
                 result_msg += f"• Permission issues"
                 reply_markup = None
             
-            await update_obj.edit_message_text(
+            await reporter.finish(
                 result_msg,
                 parse_mode='Markdown',
                 reply_markup=reply_markup
             )
+            return scan_id
+        
+        except asyncio.CancelledError:
+            if scan_saved:
+                # Scan sudah tersimpan 'completed', yang batal cuma laporan akhirnya
+                raise
+            self.logger.warning("⛔ Scan %s cancelled", scan_id)
+            self.metrics.scans.inc(mode=scan_mode, outcome='cancelled')
+            self.store.set_scan_status(scan_id, 'cancelled')
+            self.save_trace(scan_id, trace)
+            await reporter.finish(
+                self.format_interrupted_scan(scan_id, "⛔ **Scan dibatalkan**"),
+                parse_mode='Markdown',
+                reply_markup=self.resume_markup(scan_id)
+            )
+            raise
             
         except Exception as e:
+            if scan_saved:
+                # Edit Telegram terakhir gagal (RetryAfter, pesan hilang, Markdown), scan-nya tetap selesai
+                self.logger.error("Error sending report for scan %s: %s", scan_id, e)
+                return scan_id
             self.logger.error(f"Error during scan: {e}")
-            await update_obj.edit_message_text(f"❌ Error during scan: {str(e)}")
-    async def backup_callback(self, query, context):
+            self.metrics.scans.inc(mode=scan_mode, outcome='error')
+            # Server yang sudah selesai tetap tersimpan, scan bisa dilanjutkan
+            self.store.set_scan_status(scan_id, 'interrupted')
+            await reporter.finish(f"❌ Error during scan: {str(e)}", reply_markup=self.resume_markup(scan_id))
+        finally:
+            self.active_scans.pop(scan_id, None)
+            current_trace.reset(trace_token)
+    async def backup_callback(self, query, context, scan_id=None):
         """Backup files callback"""
-        scan_id = context.user_data.get('current_scan_id')
+        scan_id = scan_id or context.user_data.get('current_scan_id')
+        
+        found_files = self.store.get_found_files(scan_id) if scan_id else []
         
-        if not scan_id or scan_id not in self.scan_results:
+        if not found_files:
             await query.edit_message_text("❌ No scan results found. Please run a scan first.")
             return
         
-        scan_data = self.scan_results[scan_id]
-        found_files = scan_data['found_files']
-        
         # Show confirmation message with details
         confirm_msg = f"""
 ⚠️ **KONFIRMASI BACKUP**
@@ -638,86 +1207,317 @@ Pilih opsi di bawah untuk memulai:
 
     async def confirm_backup_callback(self, query, context, scan_id):
         """Konfirmasi backup dan mulai proses"""
-        if scan_id not in self.scan_results:
+        found_files = self.store.get_found_files(scan_id)
+        
+        if not found_files:
             await query.edit_message_text("❌ Scan results not found!")
             return
         
-        scan_data = self.scan_results[scan_id]
-        found_files = scan_data['found_files']
-        
         await query.edit_message_text("🚀 Starting backup process...")
-        await self.perform_backup(query, context, found_files)
+        await self.perform_backup(query, context, found_files, scan_id=scan_id)
 
     async def cancel_backup_callback(self, query, context):
         """Cancel backup process"""
         await query.edit_message_text("❌ Backup dibatalkan oleh user.")
 
-    async def perform_backup(self, update_obj, context, found_files):
-        """Perform backup of found files"""
+    async def cancel_scan_callback(self, query, context, scan_id):
+        """Cancel scan yang sedang berjalan; pesan progress-nya diganti ringkasan oleh perform_scan"""
+        task = self.active_scans.get(scan_id)
+        if task is None or task.done():
+            await query.message.reply_text(f"ℹ️ Scan {scan_id} tidak sedang berjalan.")
+            return
+        
+        task.cancel()
+
+    def scheduled_job_running(self) -> Optional[str]:
+        """Pesan penolakan scan manual selama job terjadwal berjalan, None kalau tidak ada"""
+        if not self.job_lock.locked():
+            return None
+        name = self.running_job['name'] if self.running_job else 'job terjadwal'
+        return f"⏳ {name} sedang berjalan. Tunggu selesai atau cancel lewat /jobs."
+
+    def check_resumable(self, scan_id: Optional[str]) -> Optional[str]:
+        """Pesan error kalau scan tidak bisa dilanjutkan, None kalau bisa"""
+        if not self.log_chat_id:
+            return "❌ Chat log belum disetup! Gunakan /start untuk setup."
+        busy = self.scheduled_job_running()
+        if busy:
+            return busy
+        if not scan_id:
+            return "ℹ️ Tidak ada scan yang bisa dilanjutkan."
+        if scan_id in self.active_scans:
+            return f"ℹ️ Scan {scan_id} masih berjalan."
+        
+        status = self.store.get_scan_status(scan_id)
+        if status is None:
+            return f"❌ Scan {scan_id} tidak ditemukan."
+        if status['status'] not in RESUMABLE_STATUS:
+            return f"ℹ️ Scan {scan_id} berstatus {status['status']} - tidak bisa dilanjutkan."
+        return None
+
+    async def resume_scan_callback(self, query, context, scan_id):
+        """Lanjutkan scan dari checkpoint lewat tombol Resume"""
+        error = self.check_resumable(scan_id)
+        if error:
+            await query.edit_message_text(error)
+            return
+        
+        await query.edit_message_text(f"♻️ Melanjutkan scan {scan_id}...")
+        await self.perform_scan(query, context, resume_scan_id=scan_id)
+
+    async def perform_backup(self, update_obj, context, found_files, scan_id=None):
+        """Perform backup of found files.
+
+        Backup berjalan sebagai pipeline: request signed URL, download,
+        upload ke Telegram, dan delete direktori masing-masing punya worker
+        pool sendiri (BACKUP_*_WORKERS) yang disambung lewat queue, jadi
+        upload yang lambat tidak menahan download berikutnya. Direktori di
+        satu server baru dihapus setelah semua file server itu selesai.
+        
+        Dengan BACKUP_ARCHIVE_MODE, semua target file di satu server
+        di-compress di server jadi satu archive, lalu archive itu yang
+        di-download dan dikirim (satu dokumen per server).
+        
+        Dengan BACKUP_BUNDLE_MODE, hasil download digabung ke zip per proses
+        backup (dipecah per BACKUP_BUNDLE_MAX_SIZE) dan file baru dihitung
+        berhasil setelah part zip yang memuatnya terkirim.
+        
+        Dengan BACKUP_DEDUP_ENABLED, file yang hash SHA-256-nya sama dengan
+        backup terakhir tidak di-upload ulang. Kalau auto-delete nonaktif,
+        file yang size/modified_at-nya (di-stat ulang, bukan dari hasil
+        scan) sama dengan backup terakhir bahkan tidak di-download. Archive
+        mode tidak menulis backup_index karena tidak ada hash per file.
+        """
         self.logger.info(f"Starting backup of {len(found_files)} files...")
+        backup_started = time.monotonic()
         
         success_count = 0
         error_count = 0
+        skipped_count = 0
         deleted_dirs = []
         
-        for i, file_info in enumerate(found_files, 1):
-            try:
-                # Progress update
-                progress_msg = f"📤 Backing up file {i}/{len(found_files)}\n"
-                progress_msg += f"🖥️ Server: {file_info['server_name']}\n"
-                progress_msg += f"📁 File: {file_info['file_path']}"
-                
-                await update_obj.edit_message_text(progress_msg)
-                
-                # Download file
-                file_content = await self.download_file_async(
-                    file_info['server_id'], 
-                    file_info['file_path']
-                )
-                
-                if file_content:
-                    # Generate backup filename
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    backup_filename = f"{self.backup_prefix}_{file_info['server_name']}_{timestamp}.json"
-                    
-                    # Create file-like object
-                    file_obj = io.BytesIO(file_content)
-                    file_obj.name = backup_filename
-                    
-                    # Send to log chat
-                    await context.bot.send_document(
-                        chat_id=self.log_chat_id,
-                        document=file_obj,
-                        filename=backup_filename,
-                        caption=f"📤 **Backup Complete**\n\n"
-                               f"🖥️ Server: `{file_info['server_name']}`\n"
-                               f"📁 Original Path: `{file_info['file_path']}`\n"
-                               f"📅 Backup Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-                               f"📊 File Size: {file_info['size']} bytes",
-                        parse_mode='Markdown'
-                    )
-                    
-                    # Delete directory if auto-delete is enabled
-                    if self.auto_delete and file_info['directory'] not in deleted_dirs:
-                        delete_success = await self.delete_directory_async(
-                            file_info['server_id'], 
-                            file_info['directory']
-                        )
-                        
-                        if delete_success:
-                            deleted_dirs.append(file_info['directory'])
-                            self.stats['total_deletions'] += 1
-                    
+        sign_queue = asyncio.Queue()
+        download_queue = asyncio.Queue(maxsize=Config.BACKUP_QUEUE_SIZE)
+        upload_queue = asyncio.Queue(maxsize=Config.BACKUP_QUEUE_SIZE)
+        delete_queue = asyncio.Queue()
+        
+        remaining_per_server = Counter(file_info['server_id'] for file_info in found_files)
+        backed_up_dirs = defaultdict(list)
+        reporter = ProgressReporter(update_obj, Config.PROGRESS_UPDATE_INTERVAL)
+        bundle = None
+        bundle_lock = asyncio.Lock()
+        bundles_sent = 0
+        if Config.BACKUP_BUNDLE_MODE:
+            bundle = BackupBundle(scan_id, self.backup_prefix, Config.BACKUP_BUNDLE_MAX_SIZE,
+                                  Config.DOWNLOAD_SPOOL_SIZE)
+        
+        async def finish_batch(batch, ok: bool, skipped: bool = False):
+            nonlocal success_count, error_count, skipped_count
+            
+            for file_info in batch:
+                self.metrics.backup_files.inc(result='skipped' if ok and skipped else 'ok' if ok else 'error')
+                if ok and skipped:
+                    # Isinya sudah ada di backup sebelumnya
+                    skipped_count += 1
+                    backed_up_dirs[file_info['server_id']].append(file_info['directory'])
+                elif ok:
                     success_count += 1
                     self.stats['total_backups'] += 1
-                    
+                    backed_up_dirs[file_info['server_id']].append(file_info['directory'])
                 else:
                     error_count += 1
-                    self.logger.error(f"Failed to download {file_info['file_path']}")
                 
+                # Semua file di server ini selesai, direktorinya aman dihapus
+                server_id = file_info['server_id']
+                remaining_per_server[server_id] -= 1
+                if remaining_per_server[server_id] == 0 and self.auto_delete and backed_up_dirs[server_id]:
+                    await delete_queue.put((server_id, backed_up_dirs.pop(server_id)))
+            
+            reporter.update(format_backup_progress(
+                success_count + error_count + skipped_count, len(found_files),
+                success_count, error_count, batch[-1]
+            ))
+        
+        async def sign_stage(batch):
+            # Cek metadata saja belum membuktikan isi file sama, jadi tidak dipakai
+            # kalau direktorinya akan dihapus; di situ dedup lewat hash hasil download
+            if Config.BACKUP_DEDUP_ENABLED and not self.auto_delete:
+                unchanged = [file_info for file_info in batch if await self.is_unchanged_since_backup(file_info)]
+                if unchanged:
+                    await finish_batch(unchanged, True, skipped=True)
+                    batch = [file_info for file_info in batch if file_info not in unchanged]
+                    if not batch:
+                        return
+            
+            server_id = batch[0]['server_id']
+            archive_name = None
+            
+            # Ukuran dari listing sudah cukup untuk menolak file besar sebelum minta URL
+            if len(batch) == 1 and (batch[0].get('size') or 0) > Config.BACKUP_MAX_FILE_SIZE:
+                self.logger.warning("Skipping %s: file too large (%s bytes)", batch[0]['file_path'], batch[0]['size'],
+                                    extra={'server_id': server_id, 'path': batch[0]['file_path']})
+                await finish_batch(batch, False)
+                return
+            
+            if len(batch) > 1:
+                with span('compress', server_id, f"{len(batch)} files"):
+                    archive_name = await self.create_archive_async(server_id, [f['file_path'] for f in batch])
+                if not archive_name:
+                    self.logger.error("Failed to create archive on %s", batch[0]['server_name'], extra={'server_id': server_id})
+                    await finish_batch(batch, False)
+                    return
+            
+            download_path = archive_name or batch[0]['file_path']
+            with span('sign', server_id, download_path):
+                download_url = await self.get_download_url_async(server_id, download_path)
+            if download_url:
+                await download_queue.put((batch, download_url, archive_name))
+            else:
+                self.logger.error("Failed to get download URL for %s", download_path,
+                                  extra={'server_id': server_id, 'path': download_path})
+                if archive_name:
+                    await self.remove_archive_async(server_id, archive_name)
+                await finish_batch(batch, False)
+        
+        async def download_stage(item):
+            batch, download_url, archive_name = item
+            with span('download', batch[0]['server_id'], archive_name or batch[0]['file_path']):
+                file_obj = await self.fetch_download_async(download_url, archive_name or batch[0]['file_path'])
+            
+            # Archive sementara langsung dihapus dari server setelah di-download
+            if archive_name:
+                await self.remove_archive_async(batch[0]['server_id'], archive_name)
+            
+            if file_obj is not None and archive_name is None and Config.BACKUP_DEDUP_ENABLED:
+                file_info = batch[0]
+                file_info['sha256'] = file_obj.sha256
+                previous = self.store.get_backup_index(file_info['server_id'], file_info['file_path'])
+                if previous and previous['sha256'] == file_obj.sha256:
+                    file_obj.close()
+                    self.store.touch_backup_index(file_info, file_obj.sha256)
+                    await finish_batch(batch, True, skipped=True)
+                    return
+            
+            if file_obj is not None:
+                await upload_queue.put((batch, file_obj, archive_name))
+            else:
+                self.logger.error("Failed to download %s", archive_name or batch[0]['file_path'],
+                                  extra={'server_id': batch[0]['server_id']})
+                await finish_batch(batch, False)
+        
+        async def send_bundle_part(part):
+            nonlocal bundles_sent
+            try:
+                with span('upload', name=part.filename):
+                    await self.send_backup_bundle(context, part, scan_id)
+                bundles_sent += 1
+                self.metrics.bytes_transferred.inc(part.size, direction='upload')
+                for file_info in part.files:
+                    self.store.record_backup(scan_id, file_info, part.filename)
+                await finish_batch(part.files, True)
             except Exception as e:
-                error_count += 1
-                self.logger.error(f"Error backing up {file_info['file_path']}: {e}")
+                self.logger.error("Error sending backup bundle %s: %s", part.filename, e)
+                await finish_batch(part.files, False)
+            finally:
+                part.discard()
+        
+        async def upload_stage(item):
+            batch, file_obj, archive_name = item
+            
+            if bundle is not None:
+                # Deflate sampai BACKUP_BUNDLE_MAX_SIZE per file: di thread, satu file sekaligus
+                with file_obj:
+                    async with bundle_lock:
+                        part = await asyncio.to_thread(
+                            bundle.add, bundle_entry_name(batch[0], archive_name), file_obj, file_obj.size, batch
+                        )
+                if part is not None:
+                    await send_bundle_part(part)
+                return
+            
+            try:
+                with span('upload', batch[0]['server_id'], archive_name or batch[0]['file_path']):
+                    if archive_name:
+                        backup_filename = await self.send_backup_archive(context, batch, file_obj, archive_name)
+                    else:
+                        backup_filename = await self.send_backup_document(context, batch[0], file_obj)
+                self.metrics.bytes_transferred.inc(file_obj.size, direction='upload')
+                for file_info in batch:
+                    self.store.record_backup(scan_id, file_info, backup_filename)
+                await finish_batch(batch, True)
+            except Exception as e:
+                self.logger.error("Error backing up %s: %s", batch[0]['server_name'], e,
+                                  extra={'server_id': batch[0]['server_id']})
+                await finish_batch(batch, False)
+            finally:
+                file_obj.close()
+        
+        async def delete_stage(item):
+            server_id, directories = item
+            with span('delete', server_id, ', '.join(directories)):
+                deleted = await self.delete_directories_async(server_id, directories)
+            for directory in deleted:
+                deleted_dirs.append((server_id, directory))
+                self.stats['total_deletions'] += 1
+        
+        async def worker(queue, handler):
+            while True:
+                item = await queue.get()
+                try:
+                    await handler(item)
+                except Exception as e:
+                    self.logger.error("Backup pipeline error: %s", e)
+                finally:
+                    queue.task_done()
+        
+        stages = [
+            (sign_queue, sign_stage, Config.BACKUP_SIGN_WORKERS),
+            (download_queue, download_stage, Config.BACKUP_DOWNLOAD_WORKERS),
+            (upload_queue, upload_stage, Config.BACKUP_UPLOAD_WORKERS),
+            (delete_queue, delete_stage, Config.BACKUP_DELETE_WORKERS)
+        ]
+        # Span sign/download/upload/delete dicatat ke trace scan asalnya
+        trace = Trace(Config.TRACE_MAX_SPANS) if Config.TRACING_ENABLED and scan_id else None
+        trace_token = current_trace.set(trace)
+        
+        workers = [
+            asyncio.create_task(worker(queue, handler))
+            for queue, handler, count in stages
+            for _ in range(max(1, count))
+        ]
+        
+        # Satu batch per server di archive mode, satu batch per file kalau tidak
+        if Config.BACKUP_ARCHIVE_MODE:
+            batches = defaultdict(list)
+            for file_info in found_files:
+                batches[file_info['server_id']].append(file_info)
+            batches = list(batches.values())
+        else:
+            batches = [[file_info] for file_info in found_files]
+        
+        try:
+            for batch in batches:
+                sign_queue.put_nowait(batch)
+            
+            # Tiap stage baru selesai setelah stage sebelumnya selesai mengisi queue-nya
+            for queue, _, _ in stages:
+                if queue is delete_queue and bundle is not None:
+                    # Part terakhir harus terkirim dulu sebelum direktorinya dihapus
+                    async with bundle_lock:
+                        part = bundle.flush()
+                    if part is not None:
+                        await send_bundle_part(part)
+                await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            current_trace.reset(trace_token)
+            # Delete di subdirektori dalam tidak mengubah updated_at maupun listing root,
+            # jadi incremental scan harus walk ulang server yang file-nya disentuh backup
+            self.store.clear_server_state(list({file_info['server_id'] for file_info in found_files}))
+        
+        self.save_trace(scan_id, trace)
+        self.metrics.backup_duration.observe(time.monotonic() - backup_started)
         
         # Update stats
         self.stats['last_backup'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -729,64 +1529,260 @@ Pilih opsi di bawah untuk memulai:
 
 ✅ **Successfully backed up:** {success_count} files
 ❌ **Errors:** {error_count} files
+⏭️ **Unchanged (skipped):** {skipped_count} files
 📂 **Total processed:** {len(found_files)} files
 
 📊 **Actions taken:**
-• Files downloaded and sent to log chat
+• Files downloaded and sent to log chat{f" ({bundles_sent} zip bundles)" if bundle is not None else ""}
 • Directories deleted: {len(deleted_dirs)} {'(Auto-delete enabled)' if self.auto_delete else '(Auto-delete disabled)'}
 
 📬 All backup files have been sent to your log chat.
         """
         
-        await update_obj.edit_message_text(final_msg, parse_mode='Markdown')
-    async def download_file_async(self, server_id: str, file_path: str) -> Optional[bytes]:
-        """Download file from server asynchronously"""
+        await reporter.finish(final_msg, parse_mode='Markdown')
+    async def is_unchanged_since_backup(self, file_info: Dict) -> bool:
+        """Cek murah: size dan modified_at sama dengan backup terakhir.
+
+        Metadata di found_files bisa basi (listing dari cache atau hasil
+        scan lama yang dipakai ulang incremental scan), jadi file di-stat
+        ulang dulu. Metadata baru ditulis balik ke ``file_info``.
+        """
+        previous = self.store.get_backup_index(file_info['server_id'], file_info['file_path'])
+        if not previous:
+            return False
+        
+        current = await self.stat_file_async(file_info['server_id'], file_info['file_path'])
+        if current is None or current.get('modified_at') is None:
+            return False
+        
+        file_info['size'] = current.get('size')
+        file_info['modified_at'] = current['modified_at']
+        return (previous['size'] == file_info['size']
+                and previous['modified_at'] == file_info['modified_at'])
+
+    async def stat_file_async(self, server_id: str, file_path: str) -> Optional[Dict]:
+        """Attribute terbaru satu file dari listing direktorinya (tanpa listing cache)"""
+        directory, _, name = f"/{file_path}".rpartition('/')
         try:
-            url = f"{self.domain}/api/client/servers/{server_id}/files/download"
-            payload = {'file': file_path}
-            
-            response = requests.post(
-                url, 
-                headers=self.client_headers, 
-                json=payload,
-                timeout=30
+            response = await self.client_request(
+                server_id, lambda: self.api.list_files(server_id, directory or '/', timeout=15)
             )
+            if response.status_code != 200:
+                return None
+            
+            for item in response.json()['data']:
+                if item['attributes']['is_file'] and item['attributes']['name'] == name:
+                    return item['attributes']
+            return None
+        except Exception as e:
+            self.logger.debug("Stat failed for %s: %s", file_path, e, extra={'server_id': server_id, 'path': file_path})
+            return None
+
+    async def get_download_url_async(self, server_id: str, file_path: str) -> Optional[str]:
+        """Minta signed download URL untuk satu file"""
+        try:
+            response = await self.client_request(server_id, lambda: self.api.get_download_url(server_id, file_path))
             
             if response.status_code == 200:
                 download_data = response.json()
-                download_url = download_data['attributes']['url']
-                
-                # Download actual file content
-                file_response = requests.get(download_url, timeout=30)
+                return download_data['attributes']['url']
+            
+            return None
+        except Exception as e:
+            self.logger.error("Exception requesting download URL for %s: %s", file_path, e,
+                              extra={'server_id': server_id, 'path': file_path})
+            return None
+
+    async def fetch_download_async(self, download_url: str, file_path: str) -> Optional[DownloadBuffer]:
+        """Download isi file dari signed URL secara streaming.
+        
+        Isi file ditulis per chunk ke DownloadBuffer (di memory sampai
+        DOWNLOAD_SPOOL_SIZE, lalu pindah ke disk) dan dibatasi
+        BACKUP_MAX_FILE_SIZE. Pemanggil wajib menutup buffer-nya.
+        """
+        try:
+            async with self.api.stream_download(download_url) as file_response:
                 if file_response.status_code == 200:
-                    return file_response.content
+                    file_obj = await read_response(
+                        file_response, Config.BACKUP_MAX_FILE_SIZE,
+                        Config.DOWNLOAD_SPOOL_SIZE, Config.DOWNLOAD_CHUNK_SIZE
+                    )
+                    self.metrics.bytes_transferred.inc(file_obj.size, direction='download')
+                    return file_obj
+            
+            return None
+        except DownloadTooLarge as e:
+            self.logger.warning("Skipping %s: file too large (%s)", file_path, e, extra={'path': file_path})
+            return None
+        except Exception as e:
+            self.logger.error("Exception downloading file %s: %s", file_path, e, extra={'path': file_path})
+            return None
+
+    async def create_archive_async(self, server_id: str, file_paths: List[str]) -> Optional[str]:
+        """Compress beberapa file di server jadi satu archive, return nama archive"""
+        try:
+            files = [path.lstrip('/') for path in file_paths]
+            response = await self.client_request(server_id, lambda: self.api.compress_files(server_id, '/', files))
+            
+            if response.status_code == 200:
+                return response.json()['attributes']['name']
             
+            self.logger.warning("Server %s: Compress failed with HTTP %s", server_id, response.status_code,
+                                extra={'server_id': server_id, 'status': response.status_code})
             return None
         except Exception as e:
-            self.logger.error(f"Exception downloading file {file_path}: {e}")
+            self.logger.error("Exception compressing files on %s: %s", server_id, e, extra={'server_id': server_id})
             return None
 
+    async def remove_archive_async(self, server_id: str, archive_name: str) -> bool:
+        """Hapus archive sementara dari root server"""
+        try:
+            response = await self.client_request(server_id, lambda: self.api.delete_files(server_id, '/', [archive_name]))
+            return response.status_code == 204
+        except Exception as e:
+            self.logger.error("Exception removing archive %s on %s: %s", archive_name, server_id, e,
+                              extra={'server_id': server_id, 'path': archive_name})
+            return False
+
+    async def send_backup_document(self, context, file_info: Dict, file_obj: DownloadBuffer) -> str:
+        """Kirim satu file backup ke log chat, return nama file backup"""
+        # Generate backup filename
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_filename = f"{self.backup_prefix}_{file_info['server_name']}_{timestamp}.json"
+        
+        file_obj.filename = backup_filename
+        file_obj.seek(0)
+        
+        # Send to log chat
+        await context.bot.send_document(
+            chat_id=self.log_chat_id,
+            document=file_obj,
+            filename=backup_filename,
+            caption=f"📤 **Backup Complete**\n\n"
+                   f"🖥️ Server: `{file_info['server_name']}`\n"
+                   f"📁 Original Path: `{file_info['file_path']}`\n"
+                   f"📅 Backup Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                   f"📊 File Size: {file_info['size']} bytes",
+            parse_mode='Markdown'
+        )
+        
+        return backup_filename
+
+    async def send_backup_archive(self, context, files: List[Dict], file_obj: DownloadBuffer, archive_name: str) -> str:
+        """Kirim archive berisi semua file backup dari satu server"""
+        server_name = files[0]['server_name']
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = archive_name.split('.', 1)[1] if '.' in archive_name else 'tar.gz'
+        backup_filename = f"{self.backup_prefix}_{server_name}_{timestamp}.{extension}"
+        
+        file_obj.filename = backup_filename
+        file_obj.seek(0)
+        
+        file_list = "\n".join(f"• `{file_info['file_path']}`" for file_info in files[:10])
+        if len(files) > 10:
+            file_list += f"\n... and {len(files) - 10} more files"
+        
+        await context.bot.send_document(
+            chat_id=self.log_chat_id,
+            document=file_obj,
+            filename=backup_filename,
+            caption=f"📦 **Backup Archive Complete**\n\n"
+                   f"🖥️ Server: `{server_name}`\n"
+                   f"📅 Backup Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                   f"📂 Files ({len(files)}):\n{file_list}",
+            parse_mode='Markdown'
+        )
+        
+        return backup_filename
+
+    async def send_backup_bundle(self, context, part, scan_id: Optional[str] = None):
+        """Kirim satu part zip bundle beserta ringkasan isinya"""
+        file_obj = await asyncio.to_thread(part.close, scan_id)
+        
+        servers = {file_info['server_id'] for file_info in part.files}
+        
+        await context.bot.send_document(
+            chat_id=self.log_chat_id,
+            document=file_obj,
+            filename=part.filename,
+            caption=f"🗜️ **Backup Bundle (Part {part.number})**\n\n"
+                   f"🆔 Scan: `{scan_id or '-'}`\n"
+                   f"📅 Backup Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                   f"📄 Files: {len(part.files)} from {len(servers)} servers\n"
+                   f"📋 Lihat `manifest.json` untuk daftar lengkap",
+            parse_mode='Markdown'
+        )
+
     async def delete_directory_async(self, server_id: str, directory_path: str) -> bool:
         """Delete directory from server asynchronously"""
         try:
-            url = f"{self.domain}/api/client/servers/{server_id}/files/delete"
-            payload = {
-                'root': '/',
-                'files': [directory_path.lstrip('/')]
-            }
-            
-            response = requests.post(
-                url, 
-                headers=self.client_headers, 
-                json=payload,
-                timeout=30
+            response = await self.client_request(
+                server_id, lambda: self.api.delete_files(server_id, '/', [directory_path.lstrip('/')])
             )
             
-            return response.status_code == 204
+            if response.status_code == 204:
+                if self.listing_cache is not None:
+                    self.listing_cache.invalidate(server_id, directory_path)
+                return True
+            return False
         except Exception as e:
-            self.logger.error(f"Exception deleting directory {directory_path}: {e}")
+            self.logger.error("Exception deleting directory %s: %s", directory_path, e,
+                              extra={'server_id': server_id, 'path': directory_path})
             return False
 
+    @staticmethod
+    def group_delete_paths(directories: List[str]) -> Tuple[str, List[str]]:
+        """Susun satu request delete: root bersama + path relatif terhadap root.
+        
+        Direktori yang berada di dalam direktori lain yang juga akan dihapus
+        dibuang, karena ikut terhapus bersama parent-nya.
+        """
+        unique = sorted(dict.fromkeys(directories))
+        top_level = []
+        for directory in unique:
+            if not any(directory.startswith(parent.rstrip('/') + '/') for parent in top_level):
+                top_level.append(directory)
+        
+        if len(top_level) == 1 or '/' in top_level:
+            root = '/'
+        else:
+            root = posixpath.commonpath([posixpath.dirname(directory) for directory in top_level])
+        
+        if root == '/':
+            return '/', [directory.lstrip('/') for directory in top_level]
+        return root, [posixpath.relpath(directory, root) for directory in top_level]
+
+    async def delete_directories_async(self, server_id: str, directories: List[str]) -> List[str]:
+        """Hapus beberapa direktori di satu server dalam satu request.
+        
+        Kalau request batch gagal (misal satu path sudah tidak ada), tiap
+        direktori dicoba satu per satu. Return direktori yang berhasil dihapus.
+        """
+        root, files = self.group_delete_paths(directories)
+        top_level = [posixpath.join(root, name) if name else root for name in files]
+        
+        if len(files) > 1:
+            try:
+                response = await self.client_request(server_id, lambda: self.api.delete_files(server_id, root, files))
+                
+                if response.status_code == 204:
+                    if self.listing_cache is not None:
+                        for directory in top_level:
+                            self.listing_cache.invalidate(server_id, directory)
+                    return top_level
+                
+                self.logger.warning("Server %s: Batch delete failed with HTTP %s, retrying per directory",
+                                    server_id, response.status_code,
+                                    extra={'server_id': server_id, 'status': response.status_code})
+            except Exception as e:
+                self.logger.error("Exception batch deleting on %s: %s", server_id, e, extra={'server_id': server_id})
+        
+        deleted = []
+        for directory in top_level:
+            if await self.delete_directory_async(server_id, directory):
+                deleted.append(directory)
+        return deleted
+
     # Command handlers
     async def scan_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Command handler untuk /scan"""
@@ -799,9 +1795,30 @@ Pilih opsi di bawah untuk memulai:
             await update.message.reply_text("❌ Chat log belum disetup! Gunakan /start untuk setup.")
             return
         
+        busy = self.scheduled_job_running()
+        if busy:
+            await update.message.reply_text(busy)
+            return
+        
         message = await update.message.reply_text("🔍 Starting comprehensive scan...")
         await self.perform_scan(message, context, quick_mode=False)
 
+    async def resume_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Command handler untuk /resume [scan_id] - Lanjutkan scan yang di-cancel/terputus"""
+        user_id = update.effective_user.id
+        if not self.check_user_permission(user_id):
+            await update.message.reply_text("❌ Anda tidak memiliki akses untuk menggunakan bot ini.")
+            return
+        
+        scan_id = context.args[0] if context.args else self.store.get_latest_resumable_scan()
+        error = self.check_resumable(scan_id)
+        if error:
+            await update.message.reply_text(error)
+            return
+        
+        message = await update.message.reply_text(f"♻️ Melanjutkan scan {scan_id}...")
+        await self.perform_scan(message, context, resume_scan_id=scan_id)
+
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Command handler untuk /stats"""
         user_id = update.effective_user.id
@@ -822,14 +1839,15 @@ Pilih opsi di bawah untuk memulai:
 • Last Backup: {self.stats['last_backup'] or 'Never'}
 
 💾 **Scan History:**
-• Cached Scan Results: {len(self.scan_results)}
+• Cached Scan Results: {self.store.count_scans()}
+• Cached Directory Listings: {len(self.listing_cache) if self.listing_cache is not None else 'Disabled'}
 
 ⚙️ **Configuration:**
 • Target Filename: `{self.target_filename}`
 • Auto Delete: {'Enabled' if self.auto_delete else 'Disabled'}
 • Subdirectory Scan: {'Enabled' if self.scan_subdirs else 'Disabled'}
 • Max Scan Depth: {self.max_depth}
-• Concurrent Scans: {Config.MAX_CONCURRENT_SCANS}
+• Concurrent Scans: {Config.MAX_SERVERS_PER_NODE}/node{f" (max {Config.MAX_CONCURRENT_SCANS})" if Config.MAX_CONCURRENT_SCANS else ""}
         """
         
         await update.message.reply_text(stats_msg, parse_mode='Markdown')
@@ -842,17 +1860,175 @@ Pilih opsi di bawah untuk memulai:
             return
         
         # Clear scan results
-        cleared_count = len(self.scan_results)
-        self.scan_results.clear()
-        self.save_persistent_data()
+        cleared_count = self.store.clear_scans()
+        
+        # Clear listing cache
+        cleared_listings = 0
+        if self.listing_cache is not None:
+            cleared_listings = self.listing_cache.clear()
+            self.save_listing_cache()
         
         await update.message.reply_text(
             f"🧹 **Cache Cleared!**\n\n"
             f"✅ Cleared {cleared_count} cached scan results\n"
+            f"📂 Cleared {cleared_listings} cached directory listings\n"
             f"💾 Persistent data updated",
             parse_mode='Markdown'
         )
 
+    async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Command handler untuk /profile <scan_id> - Breakdown waktu scan dari trace"""
+        user_id = update.effective_user.id
+        if not self.check_user_permission(user_id):
+            await update.message.reply_text("❌ Anda tidak memiliki akses untuk menggunakan bot ini.")
+            return
+        
+        scan_id = context.args[0] if context.args else self.store.get_latest_traced_scan()
+        phases = self.store.get_phase_totals(scan_id) if scan_id else []
+        
+        if not phases:
+            hint = "" if Config.TRACING_ENABLED else "\n💡 Aktifkan TRACING_ENABLED di config.py lalu jalankan scan."
+            await update.message.reply_text(f"❌ Tidak ada trace untuk scan `{scan_id or '-'}`.{hint}", parse_mode='Markdown')
+            return
+        
+        profile_msg = f"⏱️ **Profile Scan** `{scan_id}`\n\n"
+        profile_msg += "📊 **Total waktu per fase:**\n"
+        for phase in phases:
+            errors = f", {phase['errors']} error" if phase['errors'] else ""
+            profile_msg += (f"• {phase['phase']}: {phase['total']:.1f}s "
+                            f"({phase['count']}x, max {phase['max']:.2f}s{errors})\n")
+        
+        server_names = {}
+        slowest_servers = self.store.get_slowest_spans(scan_id, 'scan_server', limit=5)
+        if slowest_servers:
+            profile_msg += "\n🐢 **Server paling lambat:**\n"
+            for i, item in enumerate(slowest_servers, 1):
+                server_names[item['server_id']] = item['name']
+                profile_msg += f"{i}. `{item['name']}` - {item['duration']:.2f}s\n"
+        
+        slowest_dirs = self.store.get_slowest_spans(scan_id, 'list_directory', limit=5)
+        if slowest_dirs:
+            profile_msg += "\n📂 **Direktori paling lambat:**\n"
+            for i, item in enumerate(slowest_dirs, 1):
+                server = server_names.get(item['server_id'], item['server_id'])
+                profile_msg += f"{i}. `{server}:{item['name']}` - {item['duration']:.2f}s\n"
+        
+        profile_msg += "\n💡 Fase berjalan paralel, jadi totalnya bisa lebih besar dari durasi scan."
+        
+        await update.message.reply_text(profile_msg, parse_mode='Markdown')
+
+    async def jobs_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Command handler untuk /jobs - Lihat dan cancel job terjadwal"""
+        user_id = update.effective_user.id
+        if not self.check_user_permission(user_id):
+            await update.message.reply_text("❌ Anda tidak memiliki akses untuk menggunakan bot ini.")
+            return
+        
+        jobs_msg = "🕒 **Scheduled Jobs**\n\n"
+        
+        if self.running_job:
+            started = self.running_job['started_at'].strftime('%Y-%m-%d %H:%M:%S')
+            jobs_msg += f"▶️ **Running:** {self.running_job['name']} (since {started})\n\n"
+        else:
+            jobs_msg += "⏸️ **Running:** -\n\n"
+        
+        jobs = context.job_queue.jobs() if context.job_queue else ()
+        if jobs:
+            jobs_msg += "📅 **Next Runs:**\n"
+            for job in sorted(jobs, key=lambda job: (job.next_t is None, job.next_t.timestamp() if job.next_t else 0)):
+                next_run = job.next_t.astimezone().strftime('%Y-%m-%d %H:%M:%S') if job.next_t else '-'
+                jobs_msg += f"• {job.name}: {next_run}\n"
+        else:
+            jobs_msg += "📭 Tidak ada job terjadwal (cek SCHEDULED_SCAN_INTERVAL / OFF_PEAK_WINDOW)"
+        
+        reply_markup = None
+        if self.running_job:
+            keyboard = [[InlineKeyboardButton("⛔ Cancel Running Job", callback_data="cancel_job")]]
+            reply_markup = InlineKeyboardMarkup(keyboard)
+        
+        await update.message.reply_text(jobs_msg, parse_mode='Markdown', reply_markup=reply_markup)
+
+    async def cancel_job_callback(self, query, context):
+        """Cancel scan/backup terjadwal yang sedang berjalan"""
+        if not self.running_job:
+            await query.edit_message_text("ℹ️ Tidak ada job yang sedang berjalan.")
+            return
+        
+        self.running_job['task'].cancel()
+        await query.edit_message_text(f"⛔ Job {self.running_job['name']} dibatalkan.")
+
+    # Scheduled jobs
+    def setup_jobs(self, job_queue):
+        """Daftarkan scan terjadwal ke JobQueue sesuai config"""
+        if job_queue is None:
+            self.logger.warning("JobQueue tidak tersedia (pip install \"python-telegram-bot[job-queue]\") - scheduled scans disabled")
+            return
+        
+        if Config.SCHEDULED_SCAN_INTERVAL > 0:
+            self.schedule_interval_scan(job_queue)
+        
+        window = parse_time_window(Config.OFF_PEAK_WINDOW)
+        if window is not None:
+            self.schedule_off_peak_scan(job_queue, window)
+
+    def schedule_interval_scan(self, job_queue):
+        """Jadwalkan incremental scan berikutnya (interval + jitter)"""
+        delay = jittered_delay(Config.SCHEDULED_SCAN_INTERVAL * 60, Config.SCHEDULE_JITTER)
+        job_queue.run_once(self.scheduled_job, delay, data={'full': False}, name="Incremental scan")
+        self.logger.info(f"🕒 Next incremental scan in {delay / 60:.1f} minutes")
+
+    def schedule_off_peak_scan(self, job_queue, window, after: Optional[datetime] = None):
+        """Jadwalkan full scan di jendela off-peak berikutnya"""
+        when = next_window_run(window, after or datetime.now().astimezone())
+        job_queue.run_once(self.scheduled_job, when, data={'full': True, 'window': window}, name="Off-peak full scan")
+        self.logger.info(f"🌙 Next off-peak full scan at {when.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    async def scheduled_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Callback JobQueue: jalankan run terjadwal lalu jadwalkan run berikutnya"""
+        full = context.job.data['full']
+        
+        try:
+            if not self.log_chat_id:
+                self.logger.warning("Scheduled scan skipped - chat log belum disetup")
+            elif self.job_lock.locked():
+                self.logger.warning(f"Scheduled {context.job.name} skipped - {self.running_job['name']} masih berjalan")
+            elif self.active_scans:
+                self.logger.warning(f"Scheduled {context.job.name} skipped - scan manual {', '.join(self.active_scans)} masih berjalan")
+            else:
+                async with self.job_lock:
+                    task = asyncio.create_task(self.run_scheduled(context, full))
+                    self.running_job = {'name': context.job.name, 'started_at': datetime.now(), 'task': task}
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        self.logger.warning(f"⛔ {context.job.name} cancelled")
+                    finally:
+                        self.running_job = None
+        finally:
+            if full:
+                window = context.job.data['window']
+                self.schedule_off_peak_scan(
+                    context.job_queue, window, datetime.now().astimezone() + window_length(window)
+                )
+            else:
+                self.schedule_interval_scan(context.job_queue)
+
+    async def run_scheduled(self, context, full: bool):
+        """Scan (dan backup kalau SCHEDULED_BACKUP) tanpa interaksi user"""
+        label = "full" if full else "incremental"
+        message = await context.bot.send_message(chat_id=self.log_chat_id, text=f"🕒 Scheduled {label} scan...")
+        scan_id = await self.perform_scan(message, context, quick_mode=not full)
+        
+        if not scan_id or not Config.SCHEDULED_BACKUP:
+            return
+        
+        found_files = self.store.get_found_files(scan_id)
+        if not found_files:
+            return
+        
+        message = await context.bot.send_message(chat_id=self.log_chat_id, text="🚀 Scheduled backup...")
+        await self.perform_backup(message, context, found_files, scan_id=scan_id)
+
     async def error_handler(self, update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Log errors caused by Updates."""
         self.logger.error('Exception while handling an update:', exc_info=context.error)
@@ -875,18 +2051,31 @@ def main():
         bot = AdvancedPterodactylBackupBot()
         
         # Create application
-        app = Application.builder().token(bot.bot_token).build()
+        app = (
+            Application.builder()
+            .token(bot.bot_token)
+            .post_init(bot.post_init)
+            .post_shutdown(bot.shutdown)
+            .build()
+        )
         
         # Add handlers
         app.add_handler(CommandHandler("start", bot.start))
-        app.add_handler(CommandHandler("scan", bot.scan_command))
+        # Scan berjalan di task sendiri (block=False) supaya tombol cancel tetap diproses
+        app.add_handler(CommandHandler("scan", bot.scan_command, block=False))
+        app.add_handler(CommandHandler("resume", bot.resume_command, block=False))
         app.add_handler(CommandHandler("stats", bot.stats_command))
         app.add_handler(CommandHandler("clean", bot.clean_command))
-        app.add_handler(CallbackQueryHandler(bot.button_handler))
+        app.add_handler(CommandHandler("jobs", bot.jobs_command))
+        app.add_handler(CommandHandler("profile", bot.profile_command))
+        app.add_handler(CallbackQueryHandler(bot.button_handler, block=False))
         
         # Add error handler
         app.add_error_handler(bot.error_handler)
         
+        # Scheduled scans/backups
+        bot.setup_jobs(app.job_queue)
+        
         print("✅ Bot started successfully!")
         print(f"📋 Loaded configuration:")
         print(f"   • Domain: {bot.domain}")
@@ -894,6 +2083,8 @@ def main():
         print(f"   • Auto Delete: {bot.auto_delete}")
         print(f"   • Scan Subdirs: {bot.scan_subdirs}")
         print(f"   • Log Chat ID: {bot.log_chat_id or 'Not set'}")
+        if Config.METRICS_ENABLED:
+            print(f"   • Metrics: http://{Config.METRICS_HOST}:{Config.METRICS_PORT}/metrics")
         
         # Run bot
         print("🔄 Bot is running... Press Ctrl+C to stop.")
@@ -0,0 +1,276 @@
+"""
+Metrics
+Counter, gauge, dan histogram sederhana dalam format teks Prometheus,
+plus endpoint HTTP /metrics lokal (tanpa dependency tambahan)
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+# Bucket latency request API (detik)
+REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Bucket durasi scan/backup (detik)
+RUN_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Basis metric dengan label; nilai per kombinasi label disimpan di dict"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self.counts: Dict[LabelValues, List[int]] = {}
+        self.sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self.counts.setdefault(key, [0] * len(self.buckets))
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        self.sums[key] = self.sums.get(key, 0) + value
+
+    def samples(self):
+        for key, counts in sorted(self.counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(self.sums[key])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class BotMetrics(MetricsRegistry):
+    """Semua metric hot path scan dan backup"""
+
+    def __init__(self):
+        super().__init__()
+        self.request_duration = self.register(Histogram(
+            'pterodactyl_request_duration_seconds',
+            'Latency request ke panel/Wings per endpoint dan status',
+            ('endpoint', 'status')
+        ))
+        self.requests_in_flight = self.register(Gauge(
+            'pterodactyl_requests_in_flight',
+            'Request yang sedang berjalan per session',
+            ('session',)
+        ))
+        self.node_requests = self.register(Counter(
+            'pterodactyl_node_requests_total',
+            'Request client API per node Wings dan hasilnya (ok, error, circuit_open)',
+            ('node', 'outcome')
+        ))
+        self.scan_duration = self.register(Histogram(
+            'scan_duration_seconds',
+            'Durasi perform_scan',
+            ('mode',),
+            RUN_BUCKETS
+        ))
+        self.scans = self.register(Counter(
+            'scans_total',
+            'Scan yang selesai per mode dan hasil',
+            ('mode', 'outcome')
+        ))
+        self.servers_scanned = self.register(Counter(
+            'scan_servers_total',
+            'Server yang diproses scan per hasil (ok, failed, skipped)',
+            ('result',)
+        ))
+        self.files_found = self.register(Counter(
+            'scan_files_found_total',
+            'Target file yang ditemukan scan'
+        ))
+        self.backup_duration = self.register(Histogram(
+            'backup_duration_seconds',
+            'Durasi perform_backup',
+            (),
+            RUN_BUCKETS
+        ))
+        self.backup_files = self.register(Counter(
+            'backup_files_total',
+            'File yang diproses backup per hasil (ok, error, skipped)',
+            ('result',)
+        ))
+        self.bytes_transferred = self.register(Counter(
+            'backup_bytes_total',
+            'Bytes yang di-download dari Wings dan di-upload ke Telegram',
+            ('direction',)
+        ))
+
+
+def endpoint_label(path: str) -> str:
+    """Path request tanpa identifier server, supaya label tidak meledak"""
+    return re.sub(r'/servers/[^/]+', '/servers/{server}', path)
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport httpx yang mencatat latency dan request in-flight.
+
+    Latency diukur sampai header response diterima (body streaming tidak
+    termasuk) dan sesudah token bucket rate limit, jadi yang terukur
+    memang waktu panel/Wings. ``endpoint`` tetap dipakai untuk session
+    yang URL-nya tidak berguna sebagai label (signed URL Wings).
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: BotMetrics,
+                 session: str, endpoint: Optional[str] = None):
+        self.transport = transport
+        self.metrics = metrics
+        self.session = session
+        self.endpoint = endpoint
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = self.endpoint or endpoint_label(request.url.path)
+        status = 'error'
+        started = time.perf_counter()
+        self.metrics.requests_in_flight.inc(session=self.session)
+        try:
+            response = await self.transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            self.metrics.requests_in_flight.dec(session=self.session)
+            self.metrics.request_duration.observe(time.perf_counter() - started, endpoint=endpoint, status=status)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class MetricsServer:
+    """Server HTTP minimal yang hanya melayani GET /metrics"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"📈 Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Header request tidak dipakai, cukup dibaca sampai baris kosong
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?', 1)[0] == '/metrics':
+                status, body = '200 OK', self.registry.render().encode()
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                status, body, content_type = '404 Not Found', b'Not Found\n', 'text/plain'
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
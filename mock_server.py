@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Mock Pterodactyl + Telegram Server
+Panel Pterodactyl dan Telegram Bot API palsu untuk benchmark dan testing
+lokal, dengan fleet server sintetis (jumlah server, kedalaman tree,
+fan-out, latency, dan error rate bisa diatur)
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlparse
+
+TARGET_FILENAME = 'creds.json'
+
+
+@dataclass
+class FleetConfig:
+    servers: int = 200
+    nodes: int = 4
+    depth: int = 3
+    fanout: int = 3
+    target_ratio: float = 0.5  # Bagian server yang punya target file
+    latency_ms: float = 20  # Latency dasar per request panel/Wings
+    error_rate: float = 0.0  # Peluang files/list menjawab 500
+    offline_ratio: float = 0.1  # Bagian server dengan current_state offline
+    file_size: int = 2048
+    per_page: int = 100  # Batas per_page seperti panel
+    rate_limit: int = 0  # Request/menit client API (0 = tanpa limit)
+    seed: int = 42
+
+
+class Fleet:
+    """Fleet sintetis yang deterministik dari seed.
+
+    Tree direktori tidak disimpan; setiap listing dihitung dari index server
+    dan path, jadi fleet ribuan server tetap murah. Path yang sudah dihapus
+    lewat files/delete dicatat supaya scan berikutnya tidak melihatnya.
+    """
+
+    def __init__(self, config: FleetConfig):
+        self.config = config
+        self.deleted: Dict[str, Set[str]] = defaultdict(set)
+        self.targets: Dict[str, Optional[str]] = {}
+
+        rng = random.Random(config.seed)
+        for index in range(config.servers):
+            identifier = self.identifier(index)
+            if rng.random() < config.target_ratio:
+                depth = rng.randint(0, config.depth)
+                parts = [f"dir{rng.randrange(config.fanout)}" for _ in range(depth)]
+                self.targets[identifier] = '/' + '/'.join(parts + [TARGET_FILENAME])
+            else:
+                self.targets[identifier] = None
+
+    @staticmethod
+    def identifier(index: int) -> str:
+        return f"{index:08x}"
+
+    def server_object(self, index: int) -> Dict:
+        rng = random.Random(self.config.seed * 7919 + index)
+        status = None
+        roll = rng.random()
+        if roll < 0.01:
+            status = 'installing'
+        return {
+            'object': 'server',
+            'attributes': {
+                'id': index + 1,
+                'identifier': self.identifier(index),
+                'name': f"bench-{index}",
+                'node': index % max(1, self.config.nodes) + 1,
+                'suspended': 0.01 <= roll < 0.02,
+                'status': status,
+                'updated_at': '2024-01-01T00:00:00+00:00'
+            }
+        }
+
+    def is_deleted(self, identifier: str, path: str) -> bool:
+        return any(path == deleted or path.startswith(deleted.rstrip('/') + '/')
+                   for deleted in self.deleted[identifier])
+
+    def listing(self, identifier: str, path: str) -> Optional[List[Dict]]:
+        """Isi direktori, atau None kalau direktori tidak ada"""
+        path = '/' + path.strip('/') if path.strip('/') else '/'
+        parts = [part for part in path.split('/') if part]
+
+        if len(parts) > self.config.depth or self.is_deleted(identifier, path):
+            return None
+        if any(not re.fullmatch(r'dir\d+', part) or int(part[3:]) >= self.config.fanout for part in parts):
+            return None
+
+        entries = [('server.properties', True, 512)]
+        if len(parts) < self.config.depth:
+            entries.extend((f"dir{i}", False, 0) for i in range(self.config.fanout))
+
+        target = self.targets.get(identifier)
+        if target and (target.rsplit('/', 1)[0] or '/') == path:
+            entries.append((TARGET_FILENAME, True, self.config.file_size))
+
+        return [
+            {
+                'object': 'file_object',
+                'attributes': {
+                    'name': name, 'is_file': is_file, 'size': size, 'mode': '-rw-r--r--',
+                    'mimetype': 'application/json' if is_file else 'inode/directory',
+                    'modified_at': '2024-01-01T00:00:00+00:00'
+                }
+            }
+            for name, is_file, size in entries
+            if not self.is_deleted(identifier, f"{path.rstrip('/')}/{name}")
+        ]
+
+
+class MockState:
+    def __init__(self, fleet: Fleet):
+        self.fleet = fleet
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.documents = 0
+        self.document_bytes = 0
+        self.messages = 0
+        self.message_id = 0
+        self.window = (0, 0)
+
+    def count(self, kind: str):
+        with self.lock:
+            self.requests[kind] += 1
+
+    def next_message_id(self) -> int:
+        with self.lock:
+            self.message_id += 1
+            return self.message_id
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: MockState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # ===== HELPERS =====
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def send_json(self, status: int, payload=None, headers: Optional[Dict] = None, raw: bytes = None):
+        body = raw if raw is not None else (json.dumps(payload).encode() if payload is not None else b'')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def simulate_latency(self):
+        latency = self.state.fleet.config.latency_ms
+        if latency > 0:
+            time.sleep(random.uniform(0.5, 1.5) * latency / 1000)
+
+    def rate_limit_headers(self) -> Optional[Dict]:
+        """Fixed window per menit seperti throttle panel; None kalau kena limit"""
+        limit = self.state.fleet.config.rate_limit
+        if not limit:
+            return {}
+
+        with self.state.lock:
+            window = int(time.time() // 60)
+            current, used = self.state.window
+            used = used + 1 if current == window else 1
+            self.state.window = (window, used)
+
+        if used > limit:
+            return None
+        return {'X-RateLimit-Limit': str(limit), 'X-RateLimit-Remaining': str(max(0, limit - used))}
+
+    # ===== ROUTING =====
+
+    def do_GET(self):
+        self.route('GET', b'')
+
+    def do_POST(self):
+        self.route('POST', self.read_body())
+
+    def route(self, method: str, body: bytes):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path.startswith('/bot'):
+            return self.telegram(url.path, body)
+
+        if url.path.startswith('/download/'):
+            self.state.count('wings_download')
+            self.simulate_latency()
+            return self.send_json(200, raw=b'{"mock": "' + b'x' * self.state.fleet.config.file_size + b'"}')
+
+        if url.path == '/api/application/servers':
+            return self.application_servers(query)
+
+        match = re.fullmatch(r'/api/client/servers/([0-9a-f]+)/(files/\w+|resources)', url.path)
+        if match:
+            headers = self.rate_limit_headers()
+            if headers is None:
+                self.state.count('429')
+                return self.send_json(429, {'errors': [{'code': 'TooManyRequestsHttpException'}]},
+                                      {'Retry-After': str(60 - int(time.time()) % 60)})
+            return self.client(method, match.group(1), match.group(2), query, body, headers)
+
+        self.send_json(404, {'errors': [{'code': 'NotFoundHttpException'}]})
+
+    def application_servers(self, query):
+        self.state.count('servers')
+        self.simulate_latency()
+        config = self.state.fleet.config
+
+        page = max(1, int(query.get('page', ['1'])[0]))
+        per_page = min(config.per_page, max(1, int(query.get('per_page', ['50'])[0])))
+        total_pages = max(1, -(-config.servers // per_page))
+        start = (page - 1) * per_page
+        indexes = range(start, min(start + per_page, config.servers))
+
+        self.send_json(200, {
+            'object': 'list',
+            'data': [self.state.fleet.server_object(index) for index in indexes],
+            'meta': {'pagination': {
+                'total': config.servers, 'count': len(indexes), 'per_page': per_page,
+                'current_page': page, 'total_pages': total_pages
+            }}
+        })
+
+    def client(self, method: str, identifier: str, action: str, query, body: bytes, headers: Dict):
+        fleet = self.state.fleet
+        self.state.count(action)
+        self.simulate_latency()
+
+        if identifier not in fleet.targets:
+            return self.send_json(404, {'errors': []}, headers)
+
+        if action == 'files/list':
+            if random.random() < fleet.config.error_rate:
+                return self.send_json(500, {'errors': [{'code': 'DaemonConnectionException'}]}, headers)
+            files = fleet.listing(identifier, query.get('directory', ['/'])[0])
+            if files is None:
+                return self.send_json(404, {'errors': []}, headers)
+            return self.send_json(200, {'object': 'list', 'data': files}, headers)
+
+        if action == 'files/download':
+            file_path = query.get('file', [''])[0].lstrip('/')
+            url = f"http://{self.headers['Host']}/download/{identifier}/{file_path}"
+            return self.send_json(200, {'object': 'signed_url', 'attributes': {'url': url}}, headers)
+
+        if action == 'files/delete' and method == 'POST':
+            payload = json.loads(body or b'{}')
+            root = payload.get('root', '/').rstrip('/')
+            with self.state.lock:
+                for name in payload.get('files', []):
+                    fleet.deleted[identifier].add(f"{root}/{name}".rstrip('/') or '/')
+            return self.send_json(204, headers=headers)
+
+        if action == 'files/compress' and method == 'POST':
+            name = f"archive-{int(time.time())}.tar.gz"
+            return self.send_json(200, {'object': 'file_object', 'attributes': {
+                'name': name, 'is_file': True, 'size': fleet.config.file_size}}, headers)
+
+        if action == 'resources':
+            # Seed string (bukan hash()) supaya server offline sama di setiap proses
+            rng = random.Random(f"{fleet.config.seed}:{identifier}")
+            current_state = 'offline' if rng.random() < fleet.config.offline_ratio else 'running'
+            return self.send_json(200, {'object': 'stats', 'attributes': {'current_state': current_state}}, headers)
+
+        self.send_json(405, {'errors': []}, headers)
+
+    # ===== TELEGRAM BOT API =====
+
+    def telegram(self, path: str, body: bytes):
+        method = path.rsplit('/', 1)[-1]
+        self.state.count(f"telegram.{method}")
+
+        chat = {'id': 1, 'type': 'private'}
+        message = {'message_id': self.state.next_message_id(), 'date': int(time.time()), 'chat': chat}
+
+        if method == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'Mock', 'username': 'mock_bot',
+                      'can_join_groups': True, 'can_read_all_group_messages': False,
+                      'supports_inline_queries': False}
+        elif method == 'sendDocument':
+            with self.state.lock:
+                self.state.documents += 1
+                self.state.document_bytes += len(body)
+            result = dict(message, document={'file_id': 'mock', 'file_unique_id': 'mock'})
+        elif method in ('sendMessage', 'editMessageText'):
+            with self.state.lock:
+                self.state.messages += 1
+            result = dict(message, text='ok')
+        else:
+            result = True
+
+        self.send_json(200, {'ok': True, 'result': result})
+
+
+def start_mock_server(config: FleetConfig, host: str = '127.0.0.1', port: int = 0):
+    """Jalankan mock server di background thread, return (server, state)"""
+    state = MockState(Fleet(config))
+    handler = type('BoundMockHandler', (MockHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def add_fleet_arguments(parser: argparse.ArgumentParser):
+    defaults = FleetConfig()
+    parser.add_argument('--servers', type=int, default=defaults.servers, help='Jumlah server')
+    parser.add_argument('--nodes', type=int, default=defaults.nodes, help='Jumlah node Wings')
+    parser.add_argument('--depth', type=int, default=defaults.depth, help='Kedalaman tree direktori')
+    parser.add_argument('--fanout', type=int, default=defaults.fanout, help='Subdirektori per direktori')
+    parser.add_argument('--target-ratio', type=float, default=defaults.target_ratio)
+    parser.add_argument('--latency', type=float, default=defaults.latency_ms, help='Latency dasar (ms)')
+    parser.add_argument('--error-rate', type=float, default=defaults.error_rate, help='Peluang 500 di files/list')
+    parser.add_argument('--offline-ratio', type=float, default=defaults.offline_ratio)
+    parser.add_argument('--file-size', type=int, default=defaults.file_size, help='Ukuran target file (bytes)')
+    parser.add_argument('--rate-limit', type=int, default=defaults.rate_limit, help='Request/menit client API')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def fleet_config_from_args(args) -> FleetConfig:
+    return FleetConfig(
+        servers=args.servers, nodes=args.nodes, depth=args.depth, fanout=args.fanout,
+        target_ratio=args.target_ratio, latency_ms=args.latency, error_rate=args.error_rate,
+        offline_ratio=args.offline_ratio, file_size=args.file_size, rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Pterodactyl panel + Telegram Bot API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    add_fleet_arguments(parser)
+    args = parser.parse_args()
+
+    server, state = start_mock_server(fleet_config_from_args(args), args.host, args.port)
+    targets = sum(1 for target in state.fleet.targets.values() if target)
+
+    print("🧪 Mock Pterodactyl + Telegram server")
+    print(f"   • Panel: http://{args.host}:{server.server_address[1]}")
+    print(f"   • Telegram base_url: http://{args.host}:{server.server_address[1]}/bot")
+    print(f"   • Fleet: {args.servers} servers, {args.nodes} nodes, depth {args.depth}, "
+          f"fan-out {args.fanout}, {targets} target files")
+    print("🔄 Running... Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n⏹️ Mock server stopped")
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Progress Reporter
+Update progress ke pesan Telegram dengan throttling dan penanganan
+flood limit (RetryAfter), tanpa menahan worker scan/backup
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from telegram.error import BadRequest, RetryAfter
+
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Batas percobaan untuk pesan final kalau terus kena flood limit
+FINAL_MESSAGE_ATTEMPTS = 3
+
+
+def format_scan_progress(done: int, total: int, files_found: int,
+                         successful: int, failed: int, running: int) -> str:
+    """Teks progress untuk perform_scan"""
+    total = max(total, done, 1)
+    progress = (done / total) * 100
+
+    progress_msg = f"🔍 Scanned {done}/{total} servers\n"
+    progress_msg += f"📊 Progress: {progress:.1f}%\n"
+    progress_msg += f"📄 Files found: {files_found}\n"
+    progress_msg += f"✅ Success: {successful} | ❌ Failed: {failed}\n"
+    progress_msg += f"🔄 Running: {running} servers"
+    return progress_msg
+
+
+def format_backup_progress(done: int, total: int, successful: int,
+                           errors: int, last_file: Optional[Dict] = None) -> str:
+    """Teks progress untuk perform_backup"""
+    progress_msg = f"📤 Backed up {done}/{total} files\n"
+    progress_msg += f"✅ Success: {successful} | ❌ Errors: {errors}"
+
+    if last_file:
+        progress_msg += f"\n🖥️ Last: {last_file['server_name']}\n"
+        progress_msg += f"📁 File: {last_file['file_path']}"
+    return progress_msg
+
+
+class ProgressReporter:
+    """Edit satu pesan progress dengan rate terbatas.
+
+    ``update()`` tidak pernah menunggu Telegram: teks terbaru disimpan dan
+    dikirim oleh satu background task paling cepat setiap ``min_interval``
+    detik. Update di antaranya digabung (hanya yang terakhir dikirim), teks
+    yang sama dengan yang sudah tampil dilewati, dan RetryAfter menunda
+    edit berikutnya sesuai waktu dari Telegram.
+    """
+
+    def __init__(self, message, min_interval: float = 3.0):
+        self.message = message
+        self.min_interval = min_interval
+        self._pending = None
+        self._last_text = None
+        self._next_allowed = 0.0
+        self._task = None
+
+    def update(self, text: str, **kwargs):
+        """Jadwalkan edit progress (non-blocking)"""
+        self._pending = (text, kwargs)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while self._pending is not None:
+            delay = self._next_allowed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            text, kwargs = self._pending
+            self._pending = None
+
+            if text == self._last_text:
+                continue
+
+            try:
+                await self._edit(text, **kwargs)
+            except RetryAfter as e:
+                # Simpan lagi teks ini kecuali sudah ada yang lebih baru
+                if self._pending is None:
+                    self._pending = (text, kwargs)
+                self._next_allowed = loop.time() + e.retry_after
+                logger.debug(f"Progress update throttled by Telegram for {e.retry_after}s")
+                continue
+            except Exception as e:
+                logger.debug(f"Progress update failed: {e}")
+
+            self._next_allowed = loop.time() + self.min_interval
+
+    async def _edit(self, text: str, **kwargs):
+        # CallbackQuery punya edit_message_text, Message (dari /scan atau job) punya edit_text
+        edit = getattr(self.message, 'edit_message_text', None) or self.message.edit_text
+        try:
+            with span('telegram_edit'):
+                await edit(text, **kwargs)
+        except BadRequest as e:
+            if 'not modified' not in str(e).lower():
+                raise
+        self._last_text = text
+
+    async def finish(self, text: str, **kwargs):
+        """Kirim pesan final; update yang masih antri dibuang"""
+        self._pending = None
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+        for attempt in range(FINAL_MESSAGE_ATTEMPTS):
+            try:
+                await self._edit(text, **kwargs)
+                return
+            except RetryAfter as e:
+                if attempt == FINAL_MESSAGE_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(e.retry_after)
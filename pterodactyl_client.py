@@ -0,0 +1,185 @@
+"""
+Pterodactyl API Client
+Client HTTP async dengan connection pool terpisah untuk application key,
+client key, dan signed URL download dari Wings
+"""
+
+import importlib.util
+from typing import Dict, List, Optional
+
+import httpx
+
+from metrics import BotMetrics, InstrumentedTransport
+from rate_limiter import TokenBucket
+
+# HTTP/2 hanya aktif kalau package h2 terinstall (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+PTERODACTYL_ACCEPT = 'Application/vnd.pterodactyl.v1+json'
+
+
+class PterodactylClient:
+    """Wrapper API Pterodactyl dengan session pooled dan keep-alive.
+
+    Setiap session dibuat sekali dan dipakai ulang untuk semua request,
+    jadi handshake TCP+TLS hanya terjadi saat pool membuka koneksi baru.
+    Method endpoint mengembalikan ``httpx.Response`` apa adanya; penanganan
+    status code tetap di pemanggil. Kalau rate limit diisi (request per
+    menit), setiap request ke key itu lewat token bucket masing-masing.
+    Kalau ``metrics`` diisi, latency dan request in-flight tiap session
+    dicatat di sana.
+    """
+
+    def __init__(self, domain: str, api_key: str, client_api_key: str,
+                 pool_size: int = 20, keepalive_expiry: float = 30,
+                 http2: bool = True, timeout: float = 30,
+                 app_rate_limit: float = 0, client_rate_limit: float = 0,
+                 rate_limit_burst: int = 10, metrics: Optional[BotMetrics] = None):
+        self.domain = domain.rstrip('/')
+
+        self.headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Accept': PTERODACTYL_ACCEPT
+        }
+
+        self.client_headers = {
+            'Authorization': f'Bearer {client_api_key}',
+            'Content-Type': 'application/json',
+            'Accept': PTERODACTYL_ACCEPT
+        }
+
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.timeout = timeout
+        self.metrics = metrics
+
+        self.app_limiter = TokenBucket('Application API', app_rate_limit, rate_limit_burst) if app_rate_limit > 0 else None
+        self.client_limiter = TokenBucket('Client API', client_rate_limit, rate_limit_burst) if client_rate_limit > 0 else None
+
+        # Session dibuat saat pertama dipakai, supaya terikat ke event loop yang benar
+        self._app_session = None
+        self._client_session = None
+        self._download_session = None
+
+    def _new_session(self, name: str, headers: Optional[Dict] = None, base_url: str = '',
+                     limiter: Optional[TokenBucket] = None, endpoint: Optional[str] = None) -> httpx.AsyncClient:
+        """Buat session pooled baru"""
+        event_hooks = {}
+        if limiter is not None:
+            event_hooks = {'request': [limiter.on_request], 'response': [limiter.on_response]}
+
+        transport = httpx.AsyncHTTPTransport(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_expiry
+            )
+        )
+        if self.metrics is not None:
+            transport = InstrumentedTransport(transport, self.metrics, name, endpoint)
+
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            transport=transport,
+            timeout=self.timeout,
+            event_hooks=event_hooks
+        )
+
+    @property
+    def app_session(self) -> httpx.AsyncClient:
+        """Session untuk application API (ptla_...)"""
+        if self._app_session is None or self._app_session.is_closed:
+            self._app_session = self._new_session('application', self.headers, self.domain, self.app_limiter)
+        return self._app_session
+
+    @property
+    def client_session(self) -> httpx.AsyncClient:
+        """Session untuk client API (ptlc_...)"""
+        if self._client_session is None or self._client_session.is_closed:
+            self._client_session = self._new_session('client', self.client_headers, self.domain, self.client_limiter)
+        return self._client_session
+
+    @property
+    def download_session(self) -> httpx.AsyncClient:
+        """Session tanpa API key untuk signed URL dari Wings"""
+        if self._download_session is None or self._download_session.is_closed:
+            self._download_session = self._new_session('download', endpoint='wings_download')
+        return self._download_session
+
+    async def close(self):
+        """Tutup semua session"""
+        for session in (self._app_session, self._client_session, self._download_session):
+            if session is not None and not session.is_closed:
+                await session.aclose()
+
+    # ===== APPLICATION API =====
+
+    async def list_servers(self, page: int = 1, per_page: int = 50,
+                           timeout: Optional[float] = None) -> httpx.Response:
+        """GET /api/application/servers"""
+        params = {'page': page, 'per_page': per_page}
+        return await self.app_session.get(
+            '/api/application/servers', params=params, timeout=timeout or self.timeout
+        )
+
+    # ===== CLIENT API =====
+
+    async def get_account(self, timeout: Optional[float] = None) -> httpx.Response:
+        """GET /api/client"""
+        return await self.client_session.get('/api/client', timeout=timeout or self.timeout)
+
+    async def get_resources(self, server_id: str, timeout: Optional[float] = None) -> httpx.Response:
+        """GET /api/client/servers/{id}/resources"""
+        return await self.client_session.get(
+            f'/api/client/servers/{server_id}/resources', timeout=timeout or self.timeout
+        )
+
+    async def list_files(self, server_id: str, directory: str = "/",
+                         timeout: Optional[float] = None) -> httpx.Response:
+        """GET /api/client/servers/{id}/files/list"""
+        params = {}
+        if directory != "/":
+            params['directory'] = directory
+
+        return await self.client_session.get(
+            f'/api/client/servers/{server_id}/files/list',
+            params=params,
+            timeout=timeout or self.timeout
+        )
+
+    async def get_download_url(self, server_id: str, file_path: str,
+                               timeout: Optional[float] = None) -> httpx.Response:
+        """GET signed download URL via /api/client/servers/{id}/files/download"""
+        return await self.client_session.get(
+            f'/api/client/servers/{server_id}/files/download',
+            params={'file': file_path},
+            timeout=timeout or self.timeout
+        )
+
+    async def compress_files(self, server_id: str, root: str, files: List[str],
+                             timeout: Optional[float] = None) -> httpx.Response:
+        """POST /api/client/servers/{id}/files/compress"""
+        return await self.client_session.post(
+            f'/api/client/servers/{server_id}/files/compress',
+            json={'root': root, 'files': files},
+            timeout=timeout or self.timeout
+        )
+
+    async def delete_files(self, server_id: str, root: str, files: List[str],
+                           timeout: Optional[float] = None) -> httpx.Response:
+        """POST /api/client/servers/{id}/files/delete"""
+        return await self.client_session.post(
+            f'/api/client/servers/{server_id}/files/delete',
+            json={'root': root, 'files': files},
+            timeout=timeout or self.timeout
+        )
+
+    # ===== WINGS =====
+
+    def stream_download(self, url: str, timeout: Optional[float] = None):
+        """Download streaming dari signed URL (dipakai dengan ``async with``)"""
+        return self.download_session.stream('GET', url, timeout=timeout or self.timeout)
@@ -0,0 +1,102 @@
+"""
+Rate Limiter
+Token bucket per API key yang menyesuaikan diri dari header
+X-RateLimit-* panel, supaya scan berjalan tepat di bawah limit panel
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Panel menghitung limit per menit
+RATE_LIMIT_WINDOW = 60
+
+# Pakai sebagian dari limit panel, sisanya cadangan untuk request lain
+RATE_LIMIT_SAFETY = 0.9
+
+
+class TokenBucket:
+    """Token bucket dengan refill konstan dan burst terbatas.
+
+    ``rate_per_minute`` dari config hanya nilai awal: begitu panel
+    mengirim ``X-RateLimit-Limit``, rate diganti ke limit itu (dikurangi
+    margin), ``X-RateLimit-Remaining`` membatasi token yang boleh dipakai,
+    dan 429 menghentikan semua request sampai ``X-RateLimit-Reset`` /
+    ``Retry-After``.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int = 10):
+        self.name = name
+        self.rate = rate_per_minute / RATE_LIMIT_WINDOW
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Tunggu sampai ada token (FIFO antar pemanggil)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self.paused_until > now:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def update(self, response: httpx.Response):
+        """Sesuaikan bucket dari header rate limit response"""
+        headers = response.headers
+
+        limit = headers.get('X-RateLimit-Limit')
+        if limit and limit.isdigit() and int(limit) > 0:
+            rate = int(limit) * RATE_LIMIT_SAFETY / RATE_LIMIT_WINDOW
+            if abs(rate - self.rate) > 1e-6:
+                logger.debug(f"{self.name}: Rate limit tuned to {int(limit)}/min from panel")
+                self.rate = rate
+
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining and remaining.isdigit():
+            self._refill()
+            self.tokens = min(self.tokens, float(remaining))
+
+        if response.status_code == 429:
+            delay = self._reset_delay(headers.get('X-RateLimit-Reset') or headers.get('Retry-After'))
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            logger.warning(f"{self.name}: Rate limited by panel - pausing requests for {delay:.0f}s")
+
+    @staticmethod
+    def _reset_delay(value: Optional[str]) -> float:
+        """X-RateLimit-Reset berupa epoch, Retry-After berupa detik"""
+        if not value or not value.isdigit():
+            return float(RATE_LIMIT_WINDOW)
+
+        value = int(value)
+        if value > 1_000_000_000:
+            return max(0.0, value - time.time())
+        return float(value)
+
+    # Event hooks httpx
+
+    async def on_request(self, request: httpx.Request):
+        await self.acquire()
+
+    async def on_response(self, response: httpx.Response):
+        self.update(response)
@@ -0,0 +1,175 @@
+"""
+Retry Policy
+Retry dengan exponential backoff + jitter, dukungan header Retry-After,
+dan circuit breaker per node Wings
+"""
+
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Status yang layak dicoba ulang. 500 tidak termasuk: dari Wings artinya server
+# offline/misconfigured dan hasilnya sama kalau diulang, jadi langsung dilewati
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+# Status yang berarti node Wings-nya bermasalah (bukan server atau panel)
+NODE_FAILURE_STATUS = {502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Request tidak dikirim karena circuit breaker node sedang open"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Header Retry-After dalam detik (format angka atau HTTP-date)"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Hitung jeda antar percobaan.
+
+    Jeda dasar naik eksponensial (``base_delay * 2^attempt``, maksimal
+    ``max_delay``) lalu diacak di rentang setengah sampai penuh supaya
+    request yang gagal bersamaan tidak retry bersamaan juga.
+    """
+
+    def __init__(self, attempts: int = 3, base_delay: float = 2, max_delay: float = 60):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+
+        delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Circuit breaker per key (node Wings).
+
+    Setelah ``failure_threshold`` kegagalan berturut-turut, key dianggap
+    down selama ``reset_timeout`` detik dan request ke sana langsung
+    ditolak. Setelah itu satu request percobaan diizinkan; kalau berhasil
+    circuit tertutup lagi, kalau gagal open lagi.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures: Dict[str, int] = {}
+        self.opened_at: Dict[str, float] = {}
+        self.trial_running: Dict[str, bool] = {}
+
+    def is_open(self, key: str) -> bool:
+        opened_at = self.opened_at.get(key)
+        return opened_at is not None and time.monotonic() - opened_at < self.reset_timeout
+
+    def allow(self, key: Optional[str]) -> bool:
+        if key is None or key not in self.opened_at:
+            return True
+
+        if self.is_open(key):
+            return False
+
+        # Half-open: hanya satu request percobaan sekaligus
+        if self.trial_running.get(key):
+            return False
+        self.trial_running[key] = True
+        return True
+
+    def record_success(self, key: Optional[str]):
+        if key is None:
+            return
+        self.failures.pop(key, None)
+        self.trial_running.pop(key, None)
+        if self.opened_at.pop(key, None) is not None:
+            logger.info(f"🔌 {key}: Circuit closed - node responding again")
+
+    def record_failure(self, key: Optional[str]):
+        if key is None:
+            return
+        self.failures[key] = self.failures.get(key, 0) + 1
+        half_open = self.trial_running.pop(key, False)
+
+        if half_open or self.failures[key] >= self.failure_threshold:
+            if not self.is_open(key):
+                logger.warning(
+                    f"🔌 {key}: Circuit open after {self.failures[key]} failures - "
+                    f"skipping for {self.reset_timeout}s"
+                )
+            self.opened_at[key] = time.monotonic()
+
+    def release(self, key: Optional[str]):
+        """Request percobaan batal (misal di-cancel) tanpa hasil"""
+        if key is not None:
+            self.trial_running.pop(key, None)
+
+    def open_keys(self):
+        return [key for key in self.opened_at if self.is_open(key)]
+
+
+async def send_with_retry(send: Callable[[], Awaitable[httpx.Response]],
+                          policy: RetryPolicy,
+                          breaker: Optional[CircuitBreaker] = None,
+                          key: Optional[str] = None) -> httpx.Response:
+    """Kirim request dengan retry sesuai policy.
+
+    Return response terakhir (termasuk yang masih error setelah semua
+    percobaan habis) supaya pemanggil tetap bisa menangani status code-nya.
+    Timeout/connection error yang terus berulang di-raise lagi.
+    ``CircuitOpenError`` di-raise tanpa mengirim request kalau node down.
+    """
+    for attempt in range(policy.attempts):
+        if breaker is not None and not breaker.allow(key):
+            raise CircuitOpenError(key)
+
+        last_attempt = attempt == policy.attempts - 1
+
+        try:
+            response = await send()
+        except (httpx.TimeoutException, httpx.TransportError):
+            if breaker is not None:
+                breaker.record_failure(key)
+            if last_attempt:
+                raise
+            with span('retry_wait', name=key):
+                await asyncio.sleep(policy.delay(attempt))
+            continue
+        except BaseException:
+            if breaker is not None:
+                breaker.release(key)
+            raise
+
+        if breaker is not None:
+            if response.status_code in NODE_FAILURE_STATUS:
+                breaker.record_failure(key)
+            else:
+                breaker.record_success(key)
+
+        if response.status_code not in RETRYABLE_STATUS or last_attempt:
+            return response
+
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        with span('retry_wait', name=key):
+            await asyncio.sleep(policy.delay(attempt, retry_after))
@@ -0,0 +1,81 @@
+"""
+Scan Scheduler
+Antrian server per node Wings dengan round-robin, supaya scan menyebar
+ke semua node dan tidak ada satu daemon yang kebanjiran request
+"""
+
+import asyncio
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Hashable, Optional, Tuple
+
+
+class NodeScheduler:
+    """Pilih server berikutnya bergiliran antar node.
+
+    Server dari inventory dimasukkan ke antrian node masing-masing;
+    ``pop()`` mengambil dari node berikutnya dalam rotasi yang masih di
+    bawah ``per_node_limit`` server berjalan. Server tanpa node (None) tidak
+    dibatasi. ``release()`` dipanggil saat scan satu server selesai.
+
+    Item ``low_priority`` (misal server yang sedang offline) masuk antrian
+    terpisah dan baru diambil kalau antrian normal sudah kosong.
+    """
+
+    def __init__(self, per_node_limit: int):
+        self.per_node_limit = max(1, per_node_limit)
+        self.queues: Dict[Hashable, Deque[Any]] = {}
+        self.low_priority_queues: Dict[Hashable, Deque[Any]] = {}
+        self.rotation: Deque[Hashable] = deque()
+        self.running: Counter = Counter()
+        self.queued = 0
+
+        # Dipakai perform_scan untuk menunggu server baru / ruang antrian
+        self.work_available = asyncio.Event()
+        self.space_available = asyncio.Event()
+
+    def __len__(self) -> int:
+        return self.queued
+
+    def capacity(self, global_limit: int = 0) -> int:
+        """Server yang boleh jalan sekaligus: ``per_node_limit`` x node yang sudah terlihat,
+        dibatasi ``global_limit`` kalau lebih dari 0"""
+        capacity = self.per_node_limit * max(1, len(self.queues))
+        return min(capacity, global_limit) if global_limit > 0 else capacity
+
+    def add(self, node: Optional[Hashable], item: Any, low_priority: bool = False):
+        if node not in self.queues:
+            self.queues[node] = deque()
+            self.low_priority_queues[node] = deque()
+            self.rotation.append(node)
+
+        if low_priority:
+            self.low_priority_queues[node].append(item)
+        else:
+            self.queues[node].append(item)
+        self.queued += 1
+        self.work_available.set()
+
+    def pop(self) -> Optional[Tuple[Optional[Hashable], Any]]:
+        """Ambil ``(node, item)`` berikutnya, atau None kalau semua node penuh/kosong"""
+        use_low_priority = not any(self.queues.values())
+        queues = self.low_priority_queues if use_low_priority else self.queues
+
+        for _ in range(len(self.rotation)):
+            node = self.rotation[0]
+            self.rotation.rotate(-1)
+
+            queue = queues[node]
+            if not queue:
+                continue
+            if node is not None and self.running[node] >= self.per_node_limit:
+                continue
+
+            self.running[node] += 1
+            self.queued -= 1
+            self.space_available.set()
+            return node, queue.popleft()
+
+        return None
+
+    def release(self, node: Optional[Hashable]):
+        self.running[node] -= 1
@@ -48,7 +48,8 @@ class BotSetup:
         print("\n📦 Installing required packages...")
         
         requirements = [
-            "python-telegram-bot==20.7",
+            "python-telegram-bot[job-queue]==20.7",
+            "httpx[http2]~=0.25.2",
             "requests==2.31.0"
         ]
         
@@ -95,6 +96,7 @@ class BotSetup:
         
         required_modules = [
             'telegram',
+            'httpx',
             'requests',
             'asyncio',
             'json',
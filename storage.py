@@ -0,0 +1,471 @@
+"""
+Bot Storage
+Penyimpanan persisten berbasis SQLite (WAL) untuk setting, statistik,
+hasil scan, file yang ditemukan, dan riwayat backup
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Setiap elemen adalah satu versi schema; index + 1 = PRAGMA user_version
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS stats (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS scans (
+        scan_id TEXT PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        total_servers INTEGER NOT NULL DEFAULT 0,
+        quick_mode INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS found_files (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scan_id TEXT NOT NULL REFERENCES scans(scan_id) ON DELETE CASCADE,
+        server_id TEXT NOT NULL,
+        server_name TEXT,
+        file_path TEXT NOT NULL,
+        directory TEXT NOT NULL,
+        size INTEGER,
+        modified_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_found_files_scan ON found_files(scan_id);
+    CREATE INDEX IF NOT EXISTS idx_found_files_server ON found_files(server_id);
+
+    CREATE TABLE IF NOT EXISTS server_state (
+        scan_id TEXT NOT NULL REFERENCES scans(scan_id) ON DELETE CASCADE,
+        server_id TEXT NOT NULL,
+        updated_at TEXT,
+        fingerprint TEXT,
+        PRIMARY KEY (scan_id, server_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS backups (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scan_id TEXT,
+        server_id TEXT NOT NULL,
+        server_name TEXT,
+        file_path TEXT NOT NULL,
+        backup_filename TEXT,
+        size INTEGER,
+        created_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_backups_server_file ON backups(server_id, file_path);
+    """,
+    """
+    ALTER TABLE backups ADD COLUMN sha256 TEXT;
+
+    CREATE TABLE IF NOT EXISTS backup_index (
+        server_id TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        size INTEGER,
+        modified_at TEXT,
+        sha256 TEXT NOT NULL,
+        backup_filename TEXT,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (server_id, file_path)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trace_spans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scan_id TEXT NOT NULL REFERENCES scans(scan_id) ON DELETE CASCADE,
+        phase TEXT NOT NULL,
+        server_id TEXT,
+        name TEXT,
+        started_at REAL NOT NULL,
+        duration REAL NOT NULL,
+        status TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_trace_spans_scan ON trace_spans(scan_id, phase, duration);
+    """,
+    """
+    ALTER TABLE scans ADD COLUMN status TEXT NOT NULL DEFAULT 'completed';
+    ALTER TABLE scans ADD COLUMN updated_at TEXT;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS listing_cache (
+        server_id TEXT NOT NULL,
+        path TEXT NOT NULL,
+        dir_mtime TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        files TEXT NOT NULL,
+        PRIMARY KEY (server_id, path)
+    );
+    CREATE INDEX IF NOT EXISTS idx_listing_cache_expires ON listing_cache(expires_at);
+    """,
+]
+
+# Status scan yang bisa dilanjutkan dari checkpoint
+RESUMABLE_STATUS = ('interrupted', 'cancelled')
+
+FOUND_FILE_COLUMNS = ('server_id', 'server_name', 'file_path', 'directory', 'size', 'modified_at')
+
+
+class BotStorage:
+    """Wrapper SQLite untuk data persisten bot.
+
+    Semua write berjalan dalam transaksi kecil, jadi menyimpan satu scan
+    atau satu counter tidak perlu menulis ulang seluruh riwayat, dan crash
+    di tengah write tidak merusak data yang sudah ada.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.migrate()
+
+    def migrate(self):
+        """Terapkan migrasi schema yang belum dijalankan"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+        for index in range(version, len(MIGRATIONS)):
+            # executescript commit dulu lalu jalan per statement, jadi transaksinya
+            # harus di dalam script supaya migrasi dan user_version atomic
+            try:
+                self.conn.executescript(
+                    f"BEGIN;\n{MIGRATIONS[index]}\nPRAGMA user_version = {index + 1};\nCOMMIT;"
+                )
+            except sqlite3.Error:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                raise
+
+    def close(self):
+        self.conn.close()
+
+    # ===== SETTINGS & STATS =====
+
+    def get_setting(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row['value']) if row else default
+
+    def set_setting(self, key: str, value):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO settings (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value))
+            )
+
+    def get_stats(self) -> Dict:
+        rows = self.conn.execute("SELECT key, value FROM stats").fetchall()
+        return {row['key']: json.loads(row['value']) for row in rows}
+
+    def save_stats(self, stats: Dict):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO stats (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                [(key, json.dumps(value)) for key, value in stats.items()]
+            )
+
+    # ===== SCANS =====
+
+    def save_scan(self, scan_id: str, scan_data: Dict):
+        """Simpan satu hasil scan beserta found files dan server state"""
+        with self.conn:
+            # Upsert (bukan REPLACE) supaya trace dan checkpoint scan ini tidak ikut ter-cascade
+            self.conn.execute(
+                "INSERT INTO scans (scan_id, timestamp, total_servers, quick_mode, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'completed', ?) "
+                "ON CONFLICT(scan_id) DO UPDATE SET timestamp = excluded.timestamp, "
+                "total_servers = excluded.total_servers, quick_mode = excluded.quick_mode, "
+                "status = 'completed', updated_at = excluded.updated_at",
+                (scan_id, scan_data['timestamp'], scan_data.get('total_servers', 0),
+                 int(bool(scan_data.get('quick_mode'))), datetime.now().isoformat())
+            )
+            self.conn.execute("DELETE FROM found_files WHERE scan_id = ?", (scan_id,))
+            self.conn.executemany(
+                f"INSERT INTO found_files (scan_id, {', '.join(FOUND_FILE_COLUMNS)}) "
+                f"VALUES (?{', ?' * len(FOUND_FILE_COLUMNS)})",
+                [
+                    (scan_id, *(file_info.get(column) for column in FOUND_FILE_COLUMNS))
+                    for file_info in scan_data.get('found_files', [])
+                ]
+            )
+            self.conn.execute("DELETE FROM server_state WHERE scan_id = ?", (scan_id,))
+            self.conn.executemany(
+                "INSERT INTO server_state (scan_id, server_id, updated_at, fingerprint) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (scan_id, server_id, state.get('updated_at'), state.get('fingerprint'))
+                    for server_id, state in scan_data.get('server_state', {}).items()
+                ]
+            )
+
+    # ===== CHECKPOINTS =====
+
+    def start_scan(self, scan_id: str, quick_mode: bool):
+        """Buat baris scan berstatus 'running' supaya progress bisa di-checkpoint"""
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO scans (scan_id, timestamp, quick_mode, status, updated_at) "
+                "VALUES (?, ?, ?, 'running', ?)",
+                (scan_id, now, int(bool(quick_mode)), now)
+            )
+
+    def save_scan_progress(self, scan_id: str, found_files: List[Dict],
+                           server_states: Dict[str, Dict], total_servers: int):
+        """Checkpoint server yang selesai di-scan: found files dan server state-nya.
+
+        Server yang ada di server_state dianggap selesai dan dilewati saat
+        scan dilanjutkan.
+        """
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO found_files (scan_id, {', '.join(FOUND_FILE_COLUMNS)}) "
+                f"VALUES (?{', ?' * len(FOUND_FILE_COLUMNS)})",
+                [(scan_id, *(file_info.get(column) for column in FOUND_FILE_COLUMNS)) for file_info in found_files]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO server_state (scan_id, server_id, updated_at, fingerprint) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (scan_id, server_id, state.get('updated_at'), state.get('fingerprint'))
+                    for server_id, state in server_states.items()
+                ]
+            )
+            self.conn.execute(
+                "UPDATE scans SET total_servers = ?, updated_at = ? WHERE scan_id = ?",
+                (total_servers, datetime.now().isoformat(), scan_id)
+            )
+
+    def set_scan_status(self, scan_id: str, status: str):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE scans SET status = ?, updated_at = ? WHERE scan_id = ?",
+                (status, datetime.now().isoformat(), scan_id)
+            )
+
+    def get_scan_status(self, scan_id: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT scan_id, status, quick_mode, total_servers, updated_at, "
+            "(SELECT COUNT(*) FROM server_state WHERE server_state.scan_id = scans.scan_id) AS completed_servers, "
+            "(SELECT COUNT(*) FROM found_files WHERE found_files.scan_id = scans.scan_id) AS found_files "
+            "FROM scans WHERE scan_id = ?",
+            (scan_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def mark_interrupted_scans(self) -> List[str]:
+        """Scan yang masih 'running' saat start berasal dari proses yang mati"""
+        rows = self.conn.execute("SELECT scan_id FROM scans WHERE status = 'running'").fetchall()
+        for row in rows:
+            self.set_scan_status(row['scan_id'], 'interrupted')
+        return [row['scan_id'] for row in rows]
+
+    def get_latest_resumable_scan(self) -> Optional[str]:
+        row = self.conn.execute(
+            f"SELECT scan_id FROM scans WHERE status IN ({', '.join('?' * len(RESUMABLE_STATUS))}) "
+            "ORDER BY scan_id DESC LIMIT 1",
+            RESUMABLE_STATUS
+        ).fetchone()
+        return row['scan_id'] if row else None
+
+    def get_found_files(self, scan_id: str) -> List[Dict]:
+        rows = self.conn.execute(
+            f"SELECT {', '.join(FOUND_FILE_COLUMNS)} FROM found_files WHERE scan_id = ? ORDER BY id",
+            (scan_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_server_states(self, scan_id: str) -> Dict[str, Dict]:
+        rows = self.conn.execute(
+            "SELECT server_id, updated_at, fingerprint FROM server_state WHERE scan_id = ?",
+            (scan_id,)
+        ).fetchall()
+        return {
+            row['server_id']: {'updated_at': row['updated_at'], 'fingerprint': row['fingerprint']}
+            for row in rows
+        }
+
+    def get_latest_scan_with_state(self) -> Optional[str]:
+        """scan_id terbaru yang punya server state (untuk incremental scan)"""
+        row = self.conn.execute(
+            "SELECT scan_id FROM scans WHERE status = 'completed' AND EXISTS "
+            "(SELECT 1 FROM server_state WHERE server_state.scan_id = scans.scan_id) "
+            "ORDER BY scan_id DESC LIMIT 1"
+        ).fetchone()
+        return row['scan_id'] if row else None
+
+    def clear_server_state(self, server_ids: List[str]):
+        """Buang state incremental server ini di semua scan, jadi scan berikutnya full walk"""
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM server_state WHERE server_id = ?",
+                [(server_id,) for server_id in server_ids]
+            )
+
+    def count_scans(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM scans").fetchone()[0]
+
+    def clear_scans(self) -> int:
+        """Hapus semua hasil scan, return jumlah scan yang dihapus"""
+        count = self.count_scans()
+        with self.conn:
+            self.conn.execute("DELETE FROM scans")
+        return count
+
+    # ===== BACKUPS =====
+
+    def record_backup(self, scan_id: Optional[str], file_info: Dict, backup_filename: str):
+        """Catat backup; kalau hash isi file diketahui, backup_index ikut diperbarui"""
+        now = datetime.now().isoformat()
+        sha256 = file_info.get('sha256')
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO backups (scan_id, server_id, server_name, file_path, backup_filename, size, sha256, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (scan_id, file_info['server_id'], file_info.get('server_name'), file_info['file_path'],
+                 backup_filename, file_info.get('size'), sha256, now)
+            )
+            if sha256:
+                self._upsert_backup_index(file_info, sha256, backup_filename, now)
+
+    def get_backup_index(self, server_id: str, file_path: str) -> Optional[Dict]:
+        """Backup terakhir yang diketahui untuk (server, path)"""
+        row = self.conn.execute(
+            "SELECT size, modified_at, sha256, backup_filename FROM backup_index "
+            "WHERE server_id = ? AND file_path = ?",
+            (server_id, file_path)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def touch_backup_index(self, file_info: Dict, sha256: str):
+        """Isi sama dengan backup terakhir: cukup perbarui size/modified_at"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE backup_index SET size = ?, modified_at = ?, updated_at = ? "
+                "WHERE server_id = ? AND file_path = ? AND sha256 = ?",
+                (file_info.get('size'), file_info.get('modified_at'), datetime.now().isoformat(),
+                 file_info['server_id'], file_info['file_path'], sha256)
+            )
+
+    def _upsert_backup_index(self, file_info: Dict, sha256: str, backup_filename: str, updated_at: str):
+        self.conn.execute(
+            "INSERT INTO backup_index (server_id, file_path, size, modified_at, sha256, backup_filename, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(server_id, file_path) DO UPDATE SET size = excluded.size, "
+            "modified_at = excluded.modified_at, sha256 = excluded.sha256, "
+            "backup_filename = excluded.backup_filename, updated_at = excluded.updated_at",
+            (file_info['server_id'], file_info['file_path'], file_info.get('size'),
+             file_info.get('modified_at'), sha256, backup_filename, updated_at)
+        )
+
+    # ===== TRACES =====
+
+    def save_trace_spans(self, scan_id: str, spans: List[tuple]):
+        """Simpan span (phase, server_id, name, started_at, duration, status) untuk satu scan"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO trace_spans (scan_id, phase, server_id, name, started_at, duration, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(scan_id, *row) for row in spans]
+            )
+
+    def get_phase_totals(self, scan_id: str) -> List[Dict]:
+        """Total durasi, jumlah span, dan span error per fase"""
+        rows = self.conn.execute(
+            "SELECT phase, COUNT(*) AS count, SUM(duration) AS total, MAX(duration) AS max, "
+            "SUM(status != 'ok') AS errors FROM trace_spans WHERE scan_id = ? "
+            "GROUP BY phase ORDER BY total DESC",
+            (scan_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_slowest_spans(self, scan_id: str, phase: str, limit: int = 10) -> List[Dict]:
+        rows = self.conn.execute(
+            "SELECT server_id, name, duration, status FROM trace_spans "
+            "WHERE scan_id = ? AND phase = ? ORDER BY duration DESC LIMIT ?",
+            (scan_id, phase, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_latest_traced_scan(self) -> Optional[str]:
+        row = self.conn.execute("SELECT MAX(scan_id) FROM trace_spans").fetchone()
+        return row[0] if row else None
+
+    # ===== LISTING CACHE =====
+
+    def load_listing_cache(self, now: float) -> List[Tuple[str, str, Dict]]:
+        """Entry listing cache yang belum expired, yang paling lama dulu"""
+        rows = self.conn.execute(
+            "SELECT server_id, path, dir_mtime, expires_at, files FROM listing_cache "
+            "WHERE expires_at > ? ORDER BY expires_at",
+            (now,)
+        ).fetchall()
+        return [
+            (row['server_id'], row['path'], {
+                'dir_mtime': row['dir_mtime'],
+                'expires_at': row['expires_at'],
+                'files': json.loads(row['files'])
+            })
+            for row in rows
+        ]
+
+    def save_listing_cache(self, entries: List[Tuple[str, str, Dict]],
+                           removed: List[Tuple[str, str]], now: float):
+        """Tulis entry yang berubah dan hapus yang di-evict/invalidate; sisanya tidak disentuh"""
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM listing_cache WHERE server_id = ? AND path = ?",
+                removed
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO listing_cache (server_id, path, dir_mtime, expires_at, files) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (server_id, path, entry['dir_mtime'], entry['expires_at'],
+                     json.dumps(entry['files'], ensure_ascii=False, separators=(',', ':')))
+                    for server_id, path, entry in entries
+                ]
+            )
+            self.conn.execute("DELETE FROM listing_cache WHERE expires_at <= ?", (now,))
+
+    def clear_listing_cache(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM listing_cache")
+
+    # ===== MIGRATION =====
+
+    def import_json(self, filename: str) -> bool:
+        """Migrasi bot_data.json lama ke database (sekali saja).
+
+        File lama di-rename menjadi ``<filename>.migrated`` setelah semua
+        data berhasil di-commit, jadi migrasi tidak jalan dua kali.
+        """
+        if not os.path.exists(filename):
+            return False
+
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if data.get('log_chat_id') is not None:
+            self.set_setting('log_chat_id', data['log_chat_id'])
+
+        if data.get('stats'):
+            self.save_stats(data['stats'])
+
+        for scan_id, scan_data in data.get('scan_results', {}).items():
+            self.save_scan(scan_id, scan_data)
+
+        os.replace(filename, f"{filename}.migrated")
+        return True
@@ -4,11 +4,14 @@ Test Connectivity Script
 Tes koneksi ke Pterodactyl dan Telegram untuk debugging
 """
 
+import asyncio
 import requests
 import json
 from datetime import datetime
 
-def test_pterodactyl():
+from pterodactyl_client import PterodactylClient
+
+async def test_pterodactyl(api):
     """Test Pterodactyl API connection"""
     print("🔗 Testing Pterodactyl Connection...")
     print("-" * 40)
@@ -16,36 +19,26 @@ def test_pterodactyl():
     try:
         from config import Config
         
-        # Test Application API
-        headers = {
-            'Authorization': f'Bearer {Config.PTERODACTYL_API_KEY}',
-            'Content-Type': 'application/json',
-            'Accept': 'Application/vnd.pterodactyl.v1+json'
-        }
-        
         print(f"Domain: {Config.PTERODACTYL_DOMAIN}")
         print(f"API Key: {Config.PTERODACTYL_API_KEY[:10]}...{Config.PTERODACTYL_API_KEY[-10:]}")
         
         # Test servers endpoint
-        response = requests.get(
-            f"{Config.PTERODACTYL_DOMAIN}/api/application/servers",
-            headers=headers,
-            timeout=10
-        )
+        response = await api.list_servers(timeout=10)
         
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
             data = response.json()
             servers = data['data']
-            print(f"✅ SUCCESS: Found {len(servers)} servers")
+            total = data.get('meta', {}).get('pagination', {}).get('total', len(servers))
+            print(f"✅ SUCCESS: Found {total} servers")
             
             if servers:
                 print("\n📋 Server List:")
                 for i, server in enumerate(servers[:5], 1):  # Show first 5
                     print(f"  {i}. {server['attributes']['name']} (ID: {server['attributes']['identifier']})")
-                if len(servers) > 5:
-                    print(f"  ... and {len(servers) - 5} more servers")
+                if total > 5:
+                    print(f"  ... and {total - 5} more servers")
         else:
             print(f"❌ FAILED: {response.status_code}")
             print(f"Response: {response.text[:200]}...")
@@ -98,7 +91,7 @@ def test_telegram():
     
     print()
 
-def test_client_api():
+async def test_client_api(api):
     """Test Pterodactyl Client API"""
     print("🔐 Testing Pterodactyl Client API...")
     print("-" * 40)
@@ -106,20 +99,10 @@ def test_client_api():
     try:
         from config import Config
         
-        headers = {
-            'Authorization': f'Bearer {Config.PTERODACTYL_CLIENT_API_KEY}',
-            'Content-Type': 'application/json',
-            'Accept': 'Application/vnd.pterodactyl.v1+json'
-        }
-        
         print(f"Client API Key: {Config.PTERODACTYL_CLIENT_API_KEY[:10]}...{Config.PTERODACTYL_CLIENT_API_KEY[-10:]}")
         
         # Test client servers endpoint
-        response = requests.get(
-            f"{Config.PTERODACTYL_DOMAIN}/api/client",
-            headers=headers,
-            timeout=10
-        )
+        response = await api.get_account(timeout=10)
         
         print(f"Status Code: {response.status_code}")
         
@@ -136,7 +119,7 @@ def test_client_api():
     
     print()
 
-def test_file_operations():
+async def test_file_operations(api):
     """Test file operations on first server"""
     print("📁 Testing File Operations...")
     print("-" * 40)
@@ -145,17 +128,7 @@ def test_file_operations():
         from config import Config
         
         # Get first server
-        app_headers = {
-            'Authorization': f'Bearer {Config.PTERODACTYL_API_KEY}',
-            'Content-Type': 'application/json',
-            'Accept': 'Application/vnd.pterodactyl.v1+json'
-        }
-        
-        servers_response = requests.get(
-            f"{Config.PTERODACTYL_DOMAIN}/api/application/servers",
-            headers=app_headers,
-            timeout=10
-        )
+        servers_response = await api.list_servers(per_page=1, timeout=10)
         
         if servers_response.status_code != 200:
             print("❌ Cannot get servers list")
@@ -173,17 +146,7 @@ def test_file_operations():
         print(f"Testing with server: {server_name} ({server_id})")
         
         # Test file listing
-        client_headers = {
-            'Authorization': f'Bearer {Config.PTERODACTYL_CLIENT_API_KEY}',
-            'Content-Type': 'application/json',
-            'Accept': 'Application/vnd.pterodactyl.v1+json'
-        }
-        
-        files_response = requests.get(
-            f"{Config.PTERODACTYL_DOMAIN}/api/client/servers/{server_id}/files/list",
-            headers=client_headers,
-            timeout=10
-        )
+        files_response = await api.list_files(server_id, timeout=10)
         
         print(f"File List Status: {files_response.status_code}")
         
@@ -215,6 +178,28 @@ def test_file_operations():
     
     print()
 
+async def run_tests():
+    """Run all tests dengan satu PterodactylClient bersama"""
+    try:
+        from config import Config
+    except ImportError:
+        print("❌ config.py not found or invalid!")
+        return
+    
+    api = PterodactylClient(
+        Config.PTERODACTYL_DOMAIN,
+        Config.PTERODACTYL_API_KEY,
+        Config.PTERODACTYL_CLIENT_API_KEY
+    )
+    
+    try:
+        await test_pterodactyl(api)
+        test_telegram()
+        await test_client_api(api)
+        await test_file_operations(api)
+    finally:
+        await api.close()
+
 def main():
     """Main test function"""
     print("🧪 CONNECTIVITY TEST SCRIPT")
@@ -223,10 +208,7 @@ def main():
     print()
     
     # Run all tests
-    test_pterodactyl()
-    test_telegram()
-    test_client_api()
-    test_file_operations()
+    asyncio.run(run_tests())
     
     print("=" * 50)
     print("🎯 Test completed!")
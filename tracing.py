@@ -0,0 +1,73 @@
+"""
+Tracing
+Span per fase (daftar server, scan server, listing direktori, retry,
+download, upload, delete, edit Telegram) untuk breakdown waktu per scan_id
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import astuple, dataclass
+from typing import Iterator, List, Optional
+
+
+@dataclass
+class Span:
+    phase: str
+    server_id: Optional[str]
+    name: Optional[str]
+    started_at: float  # Detik sejak trace dimulai
+    duration: float
+    status: str
+
+    def as_row(self) -> tuple:
+        return astuple(self)
+
+
+class Trace:
+    """Kumpulan span dari satu scan atau satu proses backup.
+
+    Trace aktif disimpan di context variable, jadi task yang dibuat di
+    dalam scan (worker, wait_for, progress reporter) otomatis ikut
+    mencatat ke trace yang sama. Span di atas ``max_spans`` dibuang
+    supaya scan fleet besar tidak menghabiskan memory.
+    """
+
+    def __init__(self, max_spans: int = 100000):
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.started = time.monotonic()
+
+    def add(self, phase: str, server_id: Optional[str], name: Optional[str],
+            started: float, duration: float, status: str):
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return
+        self.spans.append(Span(phase, server_id, name, started - self.started, duration, status))
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+
+
+@contextmanager
+def span(phase: str, server_id: Optional[str] = None, name: Optional[str] = None) -> Iterator[None]:
+    """Catat durasi blok ini ke trace aktif; tanpa trace aktif tidak melakukan apa-apa"""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    status = 'ok'
+    started = time.monotonic()
+    try:
+        yield
+    except asyncio.CancelledError:
+        status = 'cancelled'
+        raise
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        trace.add(phase, server_id, name, started, time.monotonic() - started, status)